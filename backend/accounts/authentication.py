@@ -0,0 +1,94 @@
+"""
+JWT authentication without a user lookup per request.
+
+VerifyOTPView puts user_id, username, is_superuser and designation_id into
+the access token. ClaimsJWTAuthentication trusts those verified claims and
+returns a ClaimsUser instead of loading the CustomUser row; any other model
+attribute (EMAIL, DESIGNATION, ...) loads the row on first access.
+
+Like any stateless JWT check, deactivating a user takes effect when their
+access token expires (ACCESS_TOKEN_LIFETIME).
+"""
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+# CustomUser attribute -> token claim
+CLAIM_FIELDS = {
+    'USERNAME': 'username',
+    'IS_SUPERUSER': 'is_superuser',
+    'DESIGNATION_id': 'designation_id',
+}
+
+
+class ClaimsUser(TokenUser):
+    def __init__(self, token):
+        super().__init__(token)
+        self.USER_ID = token[api_settings.USER_ID_CLAIM]
+        for field, claim in CLAIM_FIELDS.items():
+            if claim in token:
+                setattr(self, field, token[claim])
+
+    @cached_property
+    def user(self):
+        """The CustomUser row, loaded on first use"""
+        from accounts.models import CustomUser
+        return CustomUser.objects.get(pk=self.USER_ID)
+
+    def __getattr__(self, attr):
+        # Only reached for attributes not set from the claims
+        if attr.startswith('_') or attr == 'token':
+            raise AttributeError(attr)
+        return getattr(self.user, attr)
+
+    def __str__(self):
+        return str(self.USERNAME)
+
+    def __eq__(self, other):
+        other_pk = getattr(other, 'pk', None)
+        if other_pk is None:
+            return NotImplemented
+        return self.pk == other_pk
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    @cached_property
+    def username(self):
+        return self.USERNAME
+
+    @cached_property
+    def is_superuser(self):
+        return self.IS_SUPERUSER
+
+    @cached_property
+    def is_staff(self):
+        return self.user.IS_STAFF
+
+    def has_perm(self, perm, obj=None):
+        return self.IS_SUPERUSER
+
+    def has_module_perms(self, app_label):
+        return self.IS_SUPERUSER
+
+    def save(self, *args, **kwargs):
+        return self.user.save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self.user.delete(*args, **kwargs)
+
+    def set_password(self, raw_password):
+        return self.user.set_password(raw_password)
+
+    def check_password(self, raw_password):
+        return self.user.check_password(raw_password)
+
+
+class ClaimsJWTAuthentication(JWTStatelessUserAuthentication):
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        return ClaimsUser(validated_token)
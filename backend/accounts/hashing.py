@@ -0,0 +1,147 @@
+"""
+Password hashing service.
+
+PBKDF2 is deliberately CPU-heavy. Hashing and password-history comparisons
+run in a small process pool so a burst of password resets cannot pin every
+request worker, and a bounded number of callers may wait on the pool at
+once - the rest get PasswordHashingBusy (HTTP 503) instead of queueing
+without limit.
+
+PASSWORD_HASHING_WORKERS = 0 hashes inline on the request thread (handy for
+local development and tests); the concurrency bound still applies.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+_pool = None
+_pool_lock = threading.Lock()
+_slots = None
+
+
+class PasswordHashingBusy(Exception):
+    """Too many password hashing jobs are already in flight"""
+
+
+def _init_worker():
+    import django
+    from core.schema import SKIP_SCHEMA_SETUP_ENV
+
+    # Workers only hash; keep core's ready() from opening a connection for schema DDL
+    os.environ[SKIP_SCHEMA_SETUP_ENV] = '1'
+    django.setup()
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn, not fork: forking a threaded server process is unsafe
+                _pool = ProcessPoolExecutor(
+                    max_workers=settings.PASSWORD_HASHING_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                )
+    return _pool
+
+
+def _discard_pool(broken):
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_in_pool(job, inline):
+    """
+    job(pool) on the worker pool. One dead worker breaks the whole executor,
+    so a broken pool is replaced and the job retried once; if that pool dies
+    too, inline() does the work on this thread.
+    """
+    for _attempt in range(2):
+        pool = _get_pool()
+        try:
+            return job(pool)
+        except BrokenProcessPool:
+            _discard_pool(pool)
+    return inline()
+
+
+@contextmanager
+def _slot():
+    global _slots
+    if _slots is None:
+        with _pool_lock:
+            if _slots is None:
+                _slots = threading.BoundedSemaphore(settings.PASSWORD_HASHING_MAX_PENDING)
+    if not _slots.acquire(timeout=settings.PASSWORD_HASHING_QUEUE_TIMEOUT):
+        raise PasswordHashingBusy("Password service is busy. Please try again shortly.")
+    try:
+        yield
+    finally:
+        _slots.release()
+
+
+def hash_password(raw_password):
+    """make_password() off the request thread"""
+    with _slot():
+        if not settings.PASSWORD_HASHING_WORKERS:
+            return make_password(raw_password)
+        return _run_in_pool(
+            lambda pool: pool.submit(make_password, raw_password).result(),
+            lambda: make_password(raw_password),
+        )
+
+
+def hash_passwords(raw_passwords):
+    """
+    make_password() for many passwords (bulk imports), spread over all pool
+    workers; takes a single slot for the whole batch.
+    """
+    raw_passwords = list(raw_passwords)
+    def inline():
+        return [make_password(raw_password) for raw_password in raw_passwords]
+
+    with _slot():
+        if not settings.PASSWORD_HASHING_WORKERS:
+            return inline()
+        chunksize = max(1, len(raw_passwords) // (settings.PASSWORD_HASHING_WORKERS * 4))
+        return _run_in_pool(lambda pool: list(pool.map(make_password, raw_passwords, chunksize=chunksize)), inline)
+
+
+def matches_any(raw_password, encoded_passwords):
+    """
+    True if raw_password matches any of the encoded hashes. Comparisons run
+    in parallel and we return as soon as one of them matches.
+    """
+    encoded_passwords = [encoded for encoded in encoded_passwords if encoded]
+    if not encoded_passwords:
+        return False
+
+    def inline():
+        return any(check_password(raw_password, encoded) for encoded in encoded_passwords)
+
+    def first_match(pool):
+        pending = {pool.submit(check_password, raw_password, encoded) for encoded in encoded_passwords}
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                if any(future.result() for future in done):
+                    return True
+            return False
+        finally:
+            for future in pending:
+                future.cancel()
+
+    with _slot():
+        if not settings.PASSWORD_HASHING_WORKERS:
+            return inline()
+        return _run_in_pool(first_match, inline)
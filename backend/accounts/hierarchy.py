@@ -0,0 +1,90 @@
+"""
+Academic hierarchy tree.
+
+UNIVERSITY -> INSTITUTE -> PROGRAM -> BRANCH -> YEAR -> SEMESTER as nested
+JSON for the cascading selectors, built with one values() query per level
+(children are fetched by the parent ids of the level above) and cached
+under the table versions of all six levels. accounts.signals watches those
+tables, so any save or delete through the level viewsets rebuilds the tree
+on the next request.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache import get_versions
+from core.master_cache import table_namespace
+
+# (model name, primary key, fields, FK to the level above, key of the children list)
+LEVELS = (
+    ('UNIVERSITY', 'UNIVERSITY_ID', ('CODE', 'NAME'), None, 'institutes'),
+    ('INSTITUTE', 'INSTITUTE_ID', ('CODE', 'NAME'), 'UNIVERSITY_id', 'programs'),
+    ('PROGRAM', 'PROGRAM_ID', ('CODE', 'NAME', 'LEVEL', 'TYPE', 'DURATION_YEARS'), 'INSTITUTE_id', 'branches'),
+    ('BRANCH', 'BRANCH_ID', ('CODE', 'NAME'), 'PROGRAM_id', 'years'),
+    ('YEAR', 'YEAR_ID', ('YEAR',), 'BRANCH_id', 'semesters'),
+    ('SEMESTER', 'SEMESTER_ID', ('SEMESTER',), 'YEAR_id', None),
+)
+
+
+def hierarchy_models():
+    from django.apps import apps
+    return [apps.get_model('accounts', name) for name, *_ in LEVELS]
+
+
+def _rows(model, pk, fields, parent_field=None, **filters):
+    queryset = model.objects.filter(IS_DELETED=False, **filters)
+    if any(field.name == 'IS_ACTIVE' for field in model._meta.fields):
+        queryset = queryset.filter(IS_ACTIVE=True)
+    columns = [pk, *fields, *([parent_field] if parent_field else [])]
+    return queryset.order_by(pk).values(*columns)
+
+
+def build_tree(institute_id=None):
+    """
+    Nested list of universities, or [institute] when institute_id is given.
+    One query per level; levels below an empty one are not queried.
+    """
+    levels = list(zip(hierarchy_models(), LEVELS))
+    if institute_id is not None:
+        levels = levels[1:]
+
+    roots = []
+    parents = {}  # id -> node of the level above
+    parent_children_key = None
+    for index, (model, (_, pk, fields, parent_field, children_key)) in enumerate(levels):
+        if index == 0:
+            filters = {pk: institute_id} if institute_id is not None else {}
+            rows = _rows(model, pk, fields, **filters)
+        elif parents:
+            rows = _rows(model, pk, fields, parent_field, **{f'{parent_field}__in': list(parents)})
+        else:
+            break
+
+        nodes = {}
+        for row in rows:
+            node = {'id': row.pop(pk), **row}
+            if children_key:
+                node[children_key] = []
+            nodes[node['id']] = node
+            if index == 0:
+                roots.append(node)
+            else:
+                parents[node.pop(parent_field)][parent_children_key].append(node)
+        parents, parent_children_key = nodes, children_key
+    return roots
+
+
+def tree_cache_key(institute_id=None):
+    """Changes whenever any level changes, so views can use it as the ETag too"""
+    namespaces = [table_namespace(model) for model in hierarchy_models()]
+    versions = get_versions(namespaces)
+    version = '.'.join(str(versions[namespace]) for namespace in namespaces)
+    return f"academic_tree:{institute_id or 'all'}:v{version}"
+
+
+def get_tree(institute_id=None, key=None):
+    key = key or tree_cache_key(institute_id)
+    tree = cache.get(key)
+    if tree is None:
+        tree = build_tree(institute_id)
+        cache.set(key, tree, settings.ACADEMIC_TREE_CACHE_TIMEOUT)
+    return tree
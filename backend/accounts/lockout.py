@@ -0,0 +1,114 @@
+"""
+Login lockout state machine for CustomUser.
+
+- 3 failed attempts: 1 hour lock
+- 5 failed attempts: 6 hours lock
+- 8 or more attempts: permanent lock (admin unlock required)
+
+The lock check is a pure read of the already-loaded user row. A failed
+attempt is recorded with one conditional UPDATE ... RETURNING, so parallel
+attempts cannot overwrite each other's counter and an account that was
+locked by a concurrent request is not bumped again.
+"""
+from datetime import timedelta
+
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from core.db import update_returning
+
+TEMPORARY_LOCK_TIERS = (
+    (5, timedelta(hours=6)),
+    (3, timedelta(hours=1)),
+)
+PERMANENT_LOCK_ATTEMPTS = 8
+PERMANENT_LOCK_REASON = "Too many failed login attempts (8+). Administrative unlock required."
+
+LOCK_FIELDS = ['FAILED_LOGIN_ATTEMPTS', 'LAST_FAILED_LOGIN', 'LOCKED_UNTIL', 'PERMANENT_LOCK', 'LOCK_REASON']
+
+
+def lock_status(user, now=None):
+    """Return (is_locked, message) without touching the database"""
+    if user.PERMANENT_LOCK:
+        return True, "Account is permanently locked. Please contact administrator."
+
+    now = now or timezone.now()
+    if user.LOCKED_UNTIL and now < user.LOCKED_UNTIL:
+        remaining = (user.LOCKED_UNTIL - now).total_seconds()
+        if remaining > 3600:
+            hours = int(remaining // 3600)
+            minutes = int((remaining % 3600) // 60)
+            return True, f"Account is locked for {hours}h {minutes}m due to multiple failed attempts."
+        return True, f"Account is locked for {int(remaining // 60)} minutes due to failed attempts."
+
+    return False, "Account is not locked."
+
+
+def remaining_attempts(failed_attempts):
+    """Attempts left before the next lock tier kicks in"""
+    for threshold in (3, 5, PERMANENT_LOCK_ATTEMPTS):
+        if failed_attempts < threshold:
+            return threshold - failed_attempts
+    return 0
+
+
+def register_failed_attempt(user):
+    """
+    Bump the failure counter and apply the lock tiers in a single statement.
+
+    The UPDATE only matches while the account is not locked, so it doubles as
+    the lock check for concurrent attempts. Refreshes the lock fields on `user`
+    and returns False when a concurrent attempt had already locked the account.
+    """
+    now = timezone.now()
+    attempts = F('FAILED_LOGIN_ATTEMPTS') + 1
+    locked_until = [
+        When(FAILED_LOGIN_ATTEMPTS__gte=threshold - 1, then=Value(now + duration))
+        for threshold, duration in TEMPORARY_LOCK_TIERS
+    ]
+    is_permanent = Q(FAILED_LOGIN_ATTEMPTS__gte=PERMANENT_LOCK_ATTEMPTS - 1)
+
+    rows = update_returning(
+        type(user).objects.filter(
+            Q(LOCKED_UNTIL__isnull=True) | Q(LOCKED_UNTIL__lte=now),
+            pk=user.pk,
+            PERMANENT_LOCK=False,
+        ),
+        {
+            'FAILED_LOGIN_ATTEMPTS': attempts,
+            'LAST_FAILED_LOGIN': now,
+            'LOCKED_UNTIL': Case(*locked_until, default=F('LOCKED_UNTIL')),
+            'PERMANENT_LOCK': Case(When(is_permanent, then=Value(True)), default=Value(False)),
+            'LOCK_REASON': Case(When(is_permanent, then=Value(PERMANENT_LOCK_REASON)), default=F('LOCK_REASON')),
+        },
+        LOCK_FIELDS,
+    )
+
+    if not rows:
+        # Locked by a concurrent attempt between our read and this update
+        user.refresh_from_db(fields=LOCK_FIELDS)
+        return False
+
+    for field, value in rows[0].items():
+        setattr(user, field, value)
+    user.mark_saved(LOCK_FIELDS)
+    return True
+
+
+def clear_failed_attempts(user):
+    """Reset the counter after a successful login; no-op when already clean"""
+    if user.PERMANENT_LOCK:
+        return False  # Can't reset if permanently locked
+    if not user.FAILED_LOGIN_ATTEMPTS and not user.LOCKED_UNTIL and not user.LAST_FAILED_LOGIN:
+        return True
+
+    type(user).objects.filter(pk=user.pk, PERMANENT_LOCK=False).update(
+        FAILED_LOGIN_ATTEMPTS=0,
+        LAST_FAILED_LOGIN=None,
+        LOCKED_UNTIL=None,
+    )
+    user.FAILED_LOGIN_ATTEMPTS = 0
+    user.LAST_FAILED_LOGIN = None
+    user.LOCKED_UNTIL = None
+    user.mark_saved(['FAILED_LOGIN_ATTEMPTS', 'LAST_FAILED_LOGIN', 'LOCKED_UNTIL'])
+    return True
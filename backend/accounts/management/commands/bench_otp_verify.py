@@ -0,0 +1,84 @@
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from accounts.models import DESIGNATION, CustomUser
+
+BENCH_USER_ID = 'BENCHOTP'
+
+
+def legacy_save(original_save):
+    """CustomUser.save as it used to be: re-read the row before every update"""
+    def save(self, *args, **kwargs):
+        if self.pk:
+            self.__class__.objects.filter(pk=self.pk).first()
+        return original_save(self, *args, **kwargs)
+    return save
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure queries and latency per request on the OTP verify path '
+        '(POST /api/auth/verify-otp/). Runs inside a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--legacy-save', action='store_true',
+                            help='Only run with the old pre-save SELECT, for comparison')
+
+    def handle(self, *args, **options):
+        modes = ['legacy'] if options['legacy_save'] else ['legacy', 'current']
+        self.stdout.write(f"{'mode':<10}{'queries/request':>18}{'ms/request':>14}")
+        for mode in modes:
+            queries, elapsed = self.run(mode, options['requests'])
+            self.stdout.write(f"{mode:<10}{queries:>18.1f}{elapsed:>14.2f}")
+
+    def run(self, mode, requests):
+        patches = []
+        if mode == 'legacy':
+            patches.append(mock.patch.object(CustomUser, 'save', legacy_save(CustomUser.save)))
+
+        total_queries = 0
+        total_time = 0.0
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=['*'], SESSION_COOKIE_SECURE=False):
+            for patch in patches:
+                patch.start()
+            try:
+                user = self.create_user()
+                client = Client()
+                for _ in range(requests):
+                    otp = user.generate_otp()
+                    started = time.perf_counter()
+                    with CaptureQueriesContext(connection) as captured:
+                        response = client.post(
+                            '/api/auth/verify-otp/',
+                            {'user_id': user.USER_ID, 'otp': otp},
+                            content_type='application/json'
+                        )
+                    total_time += time.perf_counter() - started
+                    total_queries += len(captured)
+                    if response.status_code != 200:
+                        self.stderr.write(f"Unexpected response {response.status_code}: {response.content[:200]}")
+            finally:
+                for patch in patches:
+                    patch.stop()
+                transaction.set_rollback(True)
+
+        return total_queries / requests, total_time * 1000 / requests
+
+    def create_user(self):
+        designation = DESIGNATION.objects.create(NAME='Benchmark', CODE='BENCH', PERMISSIONS={})
+        return CustomUser.objects.create_user(
+            USER_ID=BENCH_USER_ID,
+            USERNAME=BENCH_USER_ID.lower(),
+            EMAIL='benchotp@example.com',
+            password='Bench#12345',
+            FIRST_NAME='Bench',
+            LAST_NAME='User',
+            DESIGNATION=designation
+        )
@@ -1,9 +1,14 @@
-from django.db import models
+from django.db import models, transaction
+from django.conf import settings
 from django.contrib.auth.hashers import make_password, check_password
 from django.utils import timezone
 import random
 import string
-from core.models import AuditModel
+from core.models import AuditModel, DirtyFieldsMixin
+from accounts.lockout import clear_failed_attempts, lock_status, register_failed_attempt
+from accounts.hashing import hash_password, matches_any
+from accounts.permissions import has_permission
+from accounts.otp import generate_totp, verify_totp
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 import secrets
 from datetime import datetime, timedelta
@@ -107,7 +112,7 @@ class PASSWORD_HISTORY(models.Model):
         db_table = 'PASSWORD_HISTORY'
         ordering = ['-CREATED_AT']
 
-class CustomUser(AbstractUser):
+class CustomUser(DirtyFieldsMixin, AbstractUser):
     # Disable default fields completely
     last_login = None  
     date_joined = None
@@ -263,10 +268,8 @@ class CustomUser(AbstractUser):
 
     def check_password_history(self, raw_password):
         """Check if password exists in user's password history"""
-        for history in self.password_history.all()[:5]:
-            if check_password(raw_password, history.PASSWORD):
-                return False
-        return True
+        recent = self.password_history.order_by('-CREATED_AT', '-PASSWORD_HISTORY_ID').values_list('PASSWORD', flat=True)[:5]
+        return not matches_any(raw_password, recent)
 
     def set_password(self, raw_password):
         """Override set_password to include password history"""
@@ -274,25 +277,25 @@ class CustomUser(AbstractUser):
             return
 
         # Only check password history if user already exists
-        if self.pk and not self.check_password_history(raw_password):
+        if not self._state.adding and not self.check_password_history(raw_password):
             raise ValueError("Cannot reuse any of your last 5 passwords")
 
-        self.PASSWORD = make_password(raw_password)
+        self.PASSWORD = hash_password(raw_password)
         self.PASSWORD_CHANGED_AT = timezone.now()
         
         # Don't save or create password history during initial user creation
         if not self._state.adding:  # Only if this is an update, not a new user
-            self.save()
-            
-            PASSWORD_HISTORY.objects.create(
-                USER=self,
-                PASSWORD=self.PASSWORD
-            )
-            
-            # Keep only last 5 passwords
-            old_passwords = self.password_history.all()[5:]
-            for old_password in old_passwords:
-                old_password.delete()
+            with transaction.atomic():
+                self.save()
+                
+                PASSWORD_HISTORY.objects.create(
+                    USER=self,
+                    PASSWORD=self.PASSWORD
+                )
+                
+                # Keep only last 5 passwords
+                keep = self.password_history.order_by('-CREATED_AT', '-PASSWORD_HISTORY_ID').values('PASSWORD_HISTORY_ID')[:5]
+                self.password_history.exclude(PASSWORD_HISTORY_ID__in=keep).delete()
 
     def check_password(self, raw_password):
         return check_password(raw_password, self.PASSWORD)
@@ -310,39 +313,11 @@ class CustomUser(AbstractUser):
         return self.IS_SUPERUSER
 
     def increment_failed_attempts(self):
-        self.FAILED_LOGIN_ATTEMPTS = (self.FAILED_LOGIN_ATTEMPTS or 0) + 1
-        self.LAST_FAILED_LOGIN = timezone.now()
-        
-        # Update lock status based on attempts
-        if self.FAILED_LOGIN_ATTEMPTS >= 8:
-            self.PERMANENT_LOCK = True
-            self.LOCK_REASON = "Too many failed login attempts (8+). Administrative unlock required."
-        elif self.FAILED_LOGIN_ATTEMPTS >= 5:
-            self.LOCKED_UNTIL = timezone.now() + timezone.timedelta(hours=6)
-        elif self.FAILED_LOGIN_ATTEMPTS >= 3:
-            self.LOCKED_UNTIL = timezone.now() + timezone.timedelta(hours=1)
-            
-        self.save(update_fields=[
-            'FAILED_LOGIN_ATTEMPTS', 
-            'LAST_FAILED_LOGIN',
-            'PERMANENT_LOCK',
-            'LOCK_REASON',
-            'LOCKED_UNTIL'
-        ])
+        """Record a failed login; False if the account was already locked meanwhile"""
+        return register_failed_attempt(self)
 
     def reset_failed_attempts(self):
-        if self.PERMANENT_LOCK:
-            return False  # Can't reset if permanently locked
-            
-        self.FAILED_LOGIN_ATTEMPTS = 0
-        self.LAST_FAILED_LOGIN = None
-        self.LOCKED_UNTIL = None
-        self.save(update_fields=[
-            'FAILED_LOGIN_ATTEMPTS',
-            'LAST_FAILED_LOGIN',
-            'LOCKED_UNTIL'
-        ])
-        return True
+        return clear_failed_attempts(self)
 
     def is_account_locked(self):
         """
@@ -351,43 +326,7 @@ class CustomUser(AbstractUser):
         - 5 failed attempts: 6 hours lock
         - 8 or more attempts: permanent lock (admin unlock required)
         """
-        if self.PERMANENT_LOCK:
-            return True, "Account is permanently locked. Please contact administrator."
-
-        if not self.FAILED_LOGIN_ATTEMPTS or not self.LAST_FAILED_LOGIN:
-            return False, "Account is not locked."
-
-        current_time = timezone.now()
-
-        # Check for permanent lock (8+ attempts)
-        if self.FAILED_LOGIN_ATTEMPTS >= 8:
-            self.PERMANENT_LOCK = True
-            self.LOCK_REASON = "Too many failed login attempts (8+). Administrative unlock required."
-            self.save(update_fields=['PERMANENT_LOCK', 'LOCK_REASON'])
-            return True, "Account has been permanently locked due to too many failed attempts. Please contact administrator."
-
-        # Check for 6-hour lock (5-7 attempts)
-        if self.FAILED_LOGIN_ATTEMPTS >= 5:
-            lock_duration = timezone.timedelta(hours=6)
-            lock_end_time = self.LAST_FAILED_LOGIN + lock_duration
-            if current_time < lock_end_time:
-                remaining_time = lock_end_time - current_time
-                hours = int(remaining_time.total_seconds() // 3600)
-                minutes = int((remaining_time.total_seconds() % 3600) // 60)
-                return True, f"Account is locked for {hours}h {minutes}m due to multiple failed attempts."
-
-        # Check for 1-hour lock (3-4 attempts)
-        if self.FAILED_LOGIN_ATTEMPTS >= 3:
-            lock_duration = timezone.timedelta(hours=1)
-            lock_end_time = self.LAST_FAILED_LOGIN + lock_duration
-            if current_time < lock_end_time:
-                remaining_time = lock_end_time - current_time
-                minutes = int(remaining_time.total_seconds() // 60)
-                return True, f"Account is locked for {minutes} minutes due to failed attempts."
-
-        # Reset failed attempts if lock period has expired
-        self.reset_failed_attempts()
-        return False, "Account is not locked."
+        return lock_status(self)
 
     def update_login_info(self, ip_address):
         """Update login audit information"""
@@ -411,6 +350,8 @@ class CustomUser(AbstractUser):
         self.save(update_fields=update_fields)
 
     def generate_otp(self):
+        if settings.OTP_MODE == 'totp':
+            return generate_totp(self)
         try:
             otp = ''.join(secrets.choice(string.digits) for _ in range(6))
             current_time = timezone.now()
@@ -431,6 +372,7 @@ class CustomUser(AbstractUser):
             # Update instance attributes
             for field, value in update_fields.items():
                 setattr(self, field, value)
+            self.mark_saved(list(update_fields))
             
             return otp
         except Exception as e:
@@ -438,6 +380,8 @@ class CustomUser(AbstractUser):
             return None
 
     def verify_otp(self, otp, clear_on_success=False):
+        if settings.OTP_MODE == 'totp':
+            return verify_totp(self, otp, clear_on_success)
         try:
             current_time = timezone.now()
 
@@ -493,44 +437,21 @@ class CustomUser(AbstractUser):
 
     def has_module_permission(self, module_name):
         """Check if user has permission for a module based on designation"""
-        if self.IS_SUPERUSER:
-            return True
-        return self.DESIGNATION.PERMISSIONS.get(module_name, {}).get('access', False)
+        return has_permission(self, module_name, 'access')
 
     def has_action_permission(self, module_name, action):
         """Check if user has permission for specific action in a module"""
-        if self.IS_SUPERUSER:
-            return True
-        return self.DESIGNATION.PERMISSIONS.get(module_name, {}).get(action, False)
+        return has_permission(self, module_name, action)
 
     @classmethod
     def get_email_field_name(cls):
         return cls.EMAIL_FIELD
 
     def save(self, *args, **kwargs):
-        if self.pk:  # If this is an update
-            try:
-                old_instance = self.__class__.objects.filter(pk=self.pk).first()
-                if old_instance:
-                    # Store all audit fields
-                    audit_fields = [
-                        'LAST_LOGIN_ATTEMPT',
-                        'LAST_FAILED_LOGIN',
-                        'LAST_LOGIN_IP',
-                        'FAILED_LOGIN_ATTEMPTS',
-                        'IS_LOCKED',
-                        'LOCKED_UNTIL',
-                        'PERMANENT_LOCK',
-                        'LOCK_REASON',
-                        'OTP_BLOCKED_UNTIL'
-                    ]
-                    # Preserve existing audit field values
-                    for field in audit_fields:
-                        current_value = getattr(self, field, None)
-                        if current_value is None:
-                            setattr(self, field, getattr(old_instance, field, None))
-            except self.__class__.DoesNotExist:
-                pass
+        # Only write fields that changed since load, so a plain save() can't
+        # overwrite lockout/OTP audit fields updated elsewhere with stale values
+        if not self._state.adding and not args and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = self.get_dirty_fields() + ['UPDATED_AT']
         super().save(*args, **kwargs)
 
     def delete(self, *args, **kwargs):
@@ -0,0 +1,97 @@
+"""
+Stateless time-based OTP (OTP_MODE = 'totp').
+
+The code is derived from a per-user secret and the current time step, like
+TOTP (RFC 6238), so nothing is written to the USERS row to issue or verify
+it. The secret is an HMAC of SECRET_KEY, USER_ID and the password hash, so
+changing the password also invalidates outstanding codes.
+
+Attempt counting, the 15 minute block and the "already used" marker live in
+the cache instead of OTP_ATTEMPTS / OTP_BLOCKED_UNTIL. The attempt counter
+outlives every code it covers and only a successful verification clears it.
+"""
+import hashlib
+import hmac
+import struct
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+DIGITS = 6
+BLOCK_SECONDS = 15 * 60
+
+
+def _secret(user):
+    message = f'otp:{user.USER_ID}:{user.PASSWORD}'.encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).digest()
+
+
+def _code(secret, counter):
+    # HOTP dynamic truncation (RFC 4226)
+    digest = hmac.new(secret, struct.pack('>Q', counter), hashlib.sha1).digest()
+    offset = digest[-1] & 0x0F
+    value = struct.unpack('>I', digest[offset:offset + 4])[0] & 0x7FFFFFFF
+    return str(value % 10 ** DIGITS).zfill(DIGITS)
+
+
+def _current_step():
+    return int(time.time() // settings.OTP_TOTP_STEP_SECONDS)
+
+
+def _attempts_key(user):
+    return f'otp:attempts:{user.USER_ID}'
+
+
+def _blocked_key(user):
+    return f'otp:blocked:{user.USER_ID}'
+
+
+def _used_key(user, step):
+    return f'otp:used:{user.USER_ID}:{step}'
+
+
+def generate_totp(user):
+    """
+    Code for the current time step. Unlike the database mode this does not
+    reset the attempt counter: re-sending returns the same code for the rest
+    of the step, so failures are counted per user over BLOCK_SECONDS, across
+    any number of send-otp calls.
+    """
+    return _code(_secret(user), _current_step())
+
+
+def verify_totp(user, otp, clear_on_success=False):
+    """Same contract as CustomUser.verify_otp: returns (is_valid, message)"""
+    blocked_until = cache.get(_blocked_key(user))
+    if blocked_until:
+        minutes = int(max(blocked_until - time.time(), 0) // 60)
+        return False, f"OTP verification blocked for {minutes} minutes"
+
+    attempts = cache.get(_attempts_key(user), 0)
+    if attempts >= user.MAX_OTP_TRY:
+        cache.set(_blocked_key(user), time.time() + BLOCK_SECONDS, BLOCK_SECONDS)
+        cache.delete(_attempts_key(user))
+        return False, "Too many attempts. Try again after 15 minutes"
+
+    secret = _secret(user)
+    current = _current_step()
+    otp = str(otp or '')
+    for step in range(current, current - settings.OTP_TOTP_VALID_STEPS, -1):
+        if hmac.compare_digest(otp, _code(secret, step)):
+            if cache.get(_used_key(user, step)):
+                return False, "OTP has already been used"
+            cache.delete(_attempts_key(user))
+            if clear_on_success:
+                lifetime = settings.OTP_TOTP_STEP_SECONDS * settings.OTP_TOTP_VALID_STEPS
+                cache.set(_used_key(user, step), True, lifetime)
+            return True, "OTP verified successfully"
+
+    cache.add(_attempts_key(user), 0, BLOCK_SECONDS)
+    try:
+        attempts = cache.incr(_attempts_key(user))
+    except ValueError:
+        attempts = attempts + 1
+        cache.set(_attempts_key(user), attempts, BLOCK_SECONDS)
+    remaining = max(user.MAX_OTP_TRY - attempts, 0)
+    return False, f"Invalid OTP. {remaining} attempts remaining"
@@ -0,0 +1,111 @@
+"""
+Designation permissions compiled to bitmasks.
+
+DESIGNATION.PERMISSIONS looks like {"master": {"view": true, "create": false, ...}}.
+Each designation is compiled once per process into {module: mask}, so a
+permission check is a dict lookup and an integer AND. Compiled entries carry
+the designation's version from core.cache; DesignationViewSet bumps it on
+create/update and every process recompiles on its next check. Without a
+shared cache a bump is only seen by the process that made it, so the
+PERMISSIONS row itself is re-read on every recheck instead.
+"""
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.permissions import BasePermission
+
+from core.cache import bump_version, get_version, is_shared
+
+ACTIONS = ('access', 'view', 'create', 'update', 'delete')
+ACTION_BITS = {action: 1 << index for index, action in enumerate(ACTIONS)}
+
+METHOD_ACTIONS = {
+    'GET': 'view',
+    'HEAD': 'view',
+    'OPTIONS': 'view',
+    'POST': 'create',
+    'PUT': 'update',
+    'PATCH': 'update',
+    'DELETE': 'delete',
+}
+
+_compiled = {}  # designation_id -> (version, checked_at, masks)
+_compiled_lock = threading.Lock()
+
+
+def _namespace(designation_id):
+    return f'designation_permissions:{designation_id}'
+
+
+def compile_permissions(permissions):
+    """{"module": {"action": bool}} -> {"module": mask}"""
+    masks = {}
+    for module, actions in (permissions or {}).items():
+        if not isinstance(actions, dict):
+            continue
+        mask = 0
+        for action, allowed in actions.items():
+            if allowed and action in ACTION_BITS:
+                mask |= ACTION_BITS[action]
+        masks[module] = mask
+    return masks
+
+
+def get_permission_masks(designation_id):
+    """Compiled masks for a designation; the shared version is rechecked at most every few seconds"""
+    if designation_id is None:
+        return {}
+
+    now = time.monotonic()
+    entry = _compiled.get(designation_id)
+    if entry and now - entry[1] < settings.PERMISSION_CACHE_RECHECK_SECONDS:
+        return entry[2]
+
+    version = get_version(_namespace(designation_id))
+    if entry and entry[0] == version and is_shared():
+        masks = entry[2]
+    else:
+        from accounts.models import DESIGNATION
+        permissions = DESIGNATION.objects.filter(pk=designation_id).values_list('PERMISSIONS', flat=True).first()
+        masks = compile_permissions(permissions)
+
+    with _compiled_lock:
+        _compiled[designation_id] = (version, now, masks)
+    return masks
+
+
+def invalidate_designation(designation_id):
+    """Call after a designation's PERMISSIONS change"""
+    bump_version(_namespace(designation_id))
+    with _compiled_lock:
+        _compiled.pop(designation_id, None)
+
+
+def has_permission(user, module_name, action):
+    if getattr(user, 'IS_SUPERUSER', False):
+        return True
+    bit = ACTION_BITS.get(action)
+    if bit is None:
+        return False
+    masks = get_permission_masks(getattr(user, 'DESIGNATION_id', None))
+    return bool(masks.get(module_name, 0) & bit)
+
+
+class HasDesignationPermission(BasePermission):
+    """
+    Checks the request method against the view's `permission_module`
+    (GET -> view, POST -> create, PUT/PATCH -> update, DELETE -> delete).
+    Views without a permission_module are only required to be authenticated.
+    """
+    message = 'You do not have permission to perform this action.'
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+        module_name = getattr(view, 'permission_module', None)
+        if module_name is None:
+            return True
+        action = METHOD_ACTIONS.get(request.method)
+        return action is not None and has_permission(user, module_name, action)
@@ -0,0 +1,78 @@
+"""
+Login profile snapshot.
+
+The user, employee, designation and institute details VerifyOTPView returns
+after a successful OTP, built in a single query and cached. The cache key
+carries the user's profile version and a version shared by all
+designations; accounts.signals bumps them when CustomUser, EMPLOYEE_MASTER
+or DESIGNATION rows change.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import OuterRef, Subquery
+
+from core.cache import bump_version, get_versions
+
+DESIGNATIONS_NAMESPACE = 'login_profile:designations'
+
+# CustomUser fields that end up in the profile
+PROFILE_USER_FIELDS = {'USER_ID', 'FIRST_NAME', 'EMAIL', 'IS_SUPERUSER', 'DESIGNATION'}
+
+
+def _namespace(user_id):
+    return f'login_profile:{user_id}'
+
+
+def build_login_profile(user_id):
+    from accounts.models import CustomUser
+    from establishments.models import EMPLOYEE_MASTER
+
+    employee = EMPLOYEE_MASTER.objects.filter(EMPLOYEE_ID=OuterRef('USER_ID'))
+    row = CustomUser.objects.filter(pk=user_id).annotate(
+        emp_name=Subquery(employee.values('EMP_NAME')[:1]),
+        department_id=Subquery(employee.values('DEPARTMENT_id')[:1]),
+        institute_id=Subquery(employee.values('INSTITUTE__INSTITUTE_ID')[:1]),
+        institute_code=Subquery(employee.values('INSTITUTE_id')[:1]),
+    ).values(
+        'USER_ID', 'FIRST_NAME', 'EMAIL', 'IS_SUPERUSER',
+        'DESIGNATION__CODE', 'DESIGNATION__NAME', 'DESIGNATION__PERMISSIONS',
+        'emp_name', 'department_id', 'institute_id', 'institute_code',
+    ).first()
+    if row is None:
+        return None
+
+    return {
+        'user_id': row['USER_ID'],
+        'name': row['emp_name'] or row['FIRST_NAME'],
+        'email': row['EMAIL'],
+        'is_superuser': row['IS_SUPERUSER'],
+        'designation': {
+            'code': row['DESIGNATION__CODE'],
+            'name': row['DESIGNATION__NAME'],
+        },
+        'permissions': row['DESIGNATION__PERMISSIONS'] or {},
+        'department_id': row['department_id'],
+        'institute_id': row['institute_id'],
+        'institute_code': row['institute_code'],
+    }
+
+
+def get_login_profile(user_id):
+    namespace = _namespace(user_id)
+    versions = get_versions([namespace, DESIGNATIONS_NAMESPACE])
+    key = f'{namespace}:v{versions[namespace]}.{versions[DESIGNATIONS_NAMESPACE]}'
+
+    profile = cache.get(key)
+    if profile is None:
+        profile = build_login_profile(user_id)
+        if profile is not None:
+            cache.set(key, profile, settings.LOGIN_PROFILE_CACHE_TIMEOUT)
+    return profile
+
+
+def invalidate_login_profile(user_id):
+    bump_version(_namespace(user_id))
+
+
+def invalidate_all_login_profiles():
+    bump_version(DESIGNATIONS_NAMESPACE)
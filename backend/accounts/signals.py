@@ -0,0 +1,36 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.hierarchy import hierarchy_models
+from accounts.models import DESIGNATION, CustomUser
+from accounts.profile import PROFILE_USER_FIELDS, invalidate_all_login_profiles, invalidate_login_profile
+from core.master_cache import watch_table
+
+
+@receiver(post_save, sender=CustomUser)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Lockout/OTP writes touch none of the profile fields, skip those
+    if created or update_fields is None or PROFILE_USER_FIELDS.intersection(update_fields):
+        invalidate_login_profile(instance.USER_ID)
+
+
+@receiver(post_delete, sender=CustomUser)
+def user_deleted(sender, instance, **kwargs):
+    invalidate_login_profile(instance.USER_ID)
+
+
+@receiver(post_save, sender='establishments.EMPLOYEE_MASTER')
+@receiver(post_delete, sender='establishments.EMPLOYEE_MASTER')
+def employee_changed(sender, instance, **kwargs):
+    invalidate_login_profile(instance.EMPLOYEE_ID)
+
+
+@receiver(post_save, sender=DESIGNATION)
+@receiver(post_delete, sender=DESIGNATION)
+def designation_changed(sender, instance, **kwargs):
+    invalidate_all_login_profiles()
+
+
+# Every level of the academic tree (accounts.hierarchy)
+for model in hierarchy_models():
+    watch_table(model)
@@ -1,6 +1,341 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.hashers import check_password
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts import hashing
+from accounts.authentication import ClaimsJWTAuthentication
+from accounts.lockout import PERMANENT_LOCK_ATTEMPTS, clear_failed_attempts, lock_status, register_failed_attempt
+from accounts.models import (
+    ADMISSION_QUOTA_MASTER, BRANCH, CATEGORY, DASHBOARD_MASTER, DESIGNATION, INSTITUTE, PROGRAM, SEMESTER, UNIVERSITY,
+    YEAR, CustomUser
+)
+from accounts.permissions import ACTION_BITS, _namespace, get_permission_masks, has_permission, invalidate_designation
+from core.pagination import encode_cursor
+from core.testing import assert_constant_queries
+from core.throttling import take_token
+
+TEST_SETTINGS = {
+    'PASSWORD_HASHING_WORKERS': 0,
+    'PASSWORD_HASHERS': ['django.contrib.auth.hashers.MD5PasswordHasher'],
+}
+
 
 class BasicTest(TestCase):
     def test_basic(self):
         """Basic test to ensure test setup works"""
         self.assertEqual(1 + 1, 2)
+
+
+def make_user(user_id, designation=None, **extra):
+    designation = designation or DESIGNATION.objects.create(NAME=f'D-{user_id}', CODE=f'D-{user_id}', PERMISSIONS={})
+    return CustomUser.objects.create_user(
+        user_id, user_id.lower(), f'{user_id.lower()}@example.com', password='Good#pass1',
+        FIRST_NAME='Test', LAST_NAME='User', DESIGNATION=designation, **extra
+    )
+
+
+def make_hierarchy(code='T'):
+    """University -> institute -> program -> branch -> year -> semester, plus a quota and a category"""
+    university = UNIVERSITY.objects.create(
+        NAME=f'University {code}', CODE=f'U{code}', ADDRESS='-', CONTACT_NUMBER='1',
+        EMAIL=f'u{code.lower()}@example.com', ESTD_YEAR=1990
+    )
+    institute = INSTITUTE.objects.create(
+        UNIVERSITY=university, NAME=f'Institute {code}', CODE=f'I{code}', ADDRESS='-', CONTACT_NUMBER='1',
+        EMAIL=f'i{code.lower()}@example.com', ESTD_YEAR=1990
+    )
+    program = PROGRAM.objects.create(
+        INSTITUTE=institute, NAME=f'P{code}', CODE=f'P{code}', DURATION_YEARS=4, LEVEL='UG', TYPE='FT'
+    )
+    branch = BRANCH.objects.create(PROGRAM=program, NAME=f'Branch {code}', CODE=f'B{code}')
+    year = YEAR.objects.create(BRANCH=branch, YEAR='FY')
+    semester = SEMESTER.objects.create(YEAR=year, SEMESTER='1')
+    return {
+        'university': university, 'institute': institute, 'program': program, 'branch': branch,
+        'year': year, 'semester': semester,
+        'quota': ADMISSION_QUOTA_MASTER.objects.create(NAME=f'Quota {code}'),
+        'category': CATEGORY.objects.create(NAME=f'Category {code}', CODE=f'C{code}'),
+    }
+
+
+@override_settings(**TEST_SETTINGS)
+class FixtureTestCase(TestCase):
+    """One academic hierarchy and one user, created once per test class"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hierarchy = make_hierarchy()
+        cls.user = make_user('TEST1')
+
+
+@override_settings(OTP_MODE='totp')
+class TotpAttemptsTest(FixtureTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def wrong_code(self, otp):
+        return '000000' if otp != '000000' else '111111'
+
+    def test_resending_does_not_reset_attempts(self):
+        blocked = False
+        for _ in range(self.user.MAX_OTP_TRY + 1):
+            otp = self.user.generate_otp()
+            is_valid, message = self.user.verify_otp(self.wrong_code(otp))
+            self.assertFalse(is_valid)
+            if 'Too many attempts' in message:
+                blocked = True
+                break
+        self.assertTrue(blocked)
+
+        # The block holds for the right code too, and for newly sent ones
+        otp = self.user.generate_otp()
+        is_valid, message = self.user.verify_otp(otp)
+        self.assertFalse(is_valid)
+        self.assertIn('blocked', message)
+
+    def test_success_clears_attempts(self):
+        otp = self.user.generate_otp()
+        self.user.verify_otp(self.wrong_code(otp))
+        self.assertEqual(self.user.verify_otp(otp), (True, 'OTP verified successfully'))
+        _, message = self.user.verify_otp(self.wrong_code(otp))
+        self.assertIn(f'{self.user.MAX_OTP_TRY - 1} attempts remaining', message)
+
+
+class LockoutTiersTest(FixtureTestCase):
+    def fail_login(self, times):
+        for _ in range(times):
+            self.assertTrue(register_failed_attempt(self.user))
+
+    def expire_lock(self):
+        CustomUser.objects.filter(pk=self.user.pk).update(LOCKED_UNTIL=timezone.now() - timedelta(seconds=1))
+        self.user.refresh_from_db()
+
+    def test_lock_tiers(self):
+        self.fail_login(2)
+        self.assertIsNone(self.user.LOCKED_UNTIL)
+
+        self.fail_login(1)
+        self.assertAlmostEqual(self.user.LOCKED_UNTIL - timezone.now(), timedelta(hours=1), delta=timedelta(minutes=1))
+        self.assertTrue(lock_status(self.user)[0])
+        # Attempts while locked are not counted
+        self.assertFalse(register_failed_attempt(self.user))
+        self.assertEqual(self.user.FAILED_LOGIN_ATTEMPTS, 3)
+
+        self.expire_lock()
+        self.fail_login(1)
+        self.assertAlmostEqual(self.user.LOCKED_UNTIL - timezone.now(), timedelta(hours=1), delta=timedelta(minutes=1))
+
+        self.expire_lock()
+        self.fail_login(1)
+        self.assertAlmostEqual(self.user.LOCKED_UNTIL - timezone.now(), timedelta(hours=6), delta=timedelta(minutes=1))
+
+        for _ in range(PERMANENT_LOCK_ATTEMPTS - 5):
+            self.expire_lock()
+            self.fail_login(1)
+        self.assertTrue(self.user.PERMANENT_LOCK)
+        self.assertFalse(clear_failed_attempts(self.user))
+
+    def test_lock_fields_are_not_written_back_by_save(self):
+        self.fail_login(1)
+        # Another request records a failure in the meantime
+        CustomUser.objects.filter(pk=self.user.pk).update(FAILED_LOGIN_ATTEMPTS=2)
+        self.user.FIRST_NAME = 'Renamed'
+        self.user.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.FAILED_LOGIN_ATTEMPTS, 2)
+
+    def test_success_clears_attempts(self):
+        self.fail_login(2)
+        self.assertTrue(clear_failed_attempts(self.user))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.FAILED_LOGIN_ATTEMPTS, 0)
+        self.assertIsNone(self.user.LAST_FAILED_LOGIN)
+
+
+@override_settings(**dict(TEST_SETTINGS, PASSWORD_HASHING_WORKERS=2))
+class HashingPoolTest(TestCase):
+    def broken_pool(self):
+        pool = mock.Mock()
+        pool.submit.side_effect = pool.map.side_effect = BrokenProcessPool('worker died')
+        return pool
+
+    def pools(self, *pools):
+        return mock.patch.object(hashing, '_get_pool', side_effect=pools)
+
+    def test_broken_pool_is_replaced(self):
+        broken = self.broken_pool()
+        with ThreadPoolExecutor(1) as fresh, self.pools(broken, fresh):
+            self.assertTrue(check_password('Good#pass1', hashing.hash_password('Good#pass1')))
+        broken.shutdown.assert_called_once()
+
+    def test_falls_back_to_hashing_inline(self):
+        with mock.patch.object(hashing, '_get_pool', side_effect=self.broken_pool):
+            hashed = hashing.hash_passwords(['One#pass1', 'Two#pass2'])
+            self.assertTrue(hashing.matches_any('Two#pass2', hashed))
+            self.assertFalse(hashing.matches_any('Three#pass3', hashed))
+
+
+class DesignationPermissionsTest(FixtureTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.admin = make_user('ADMIN1', IS_SUPERUSER=True)
+        cls.designation = cls.user.DESIGNATION
+        cls.designation.PERMISSIONS = {'master': {'view': True}}
+        cls.designation.save()
+
+    def setUp(self):
+        invalidate_designation(self.designation.pk)
+
+    def set_permissions(self, permissions):
+        DESIGNATION.objects.filter(pk=self.designation.pk).update(PERMISSIONS=permissions)
+
+    def test_update_applies_at_once(self):
+        self.assertTrue(has_permission(self.user, 'master', 'view'))
+        self.assertFalse(has_permission(self.user, 'master', 'create'))
+
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.patch(
+            f'/api/master/designations/{self.designation.pk}/',
+            {'PERMISSIONS': {'master': {'view': True, 'create': True}}}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(has_permission(self.user, 'master', 'create'))
+
+    @override_settings(PERMISSION_CACHE_RECHECK_SECONDS=0)
+    def test_shared_cache_recompiles_on_version_bump(self):
+        with mock.patch('accounts.permissions.is_shared', return_value=True):
+            self.assertEqual(get_permission_masks(self.designation.pk), {'master': ACTION_BITS['view']})
+            self.set_permissions({'master': {'delete': True}})
+            self.assertEqual(get_permission_masks(self.designation.pk), {'master': ACTION_BITS['view']})
+
+            # A bump made by another worker process
+            cache.incr(f'version:{_namespace(self.designation.pk)}')
+            self.assertEqual(get_permission_masks(self.designation.pk), {'master': ACTION_BITS['delete']})
+
+    @override_settings(PERMISSION_CACHE_RECHECK_SECONDS=0)
+    def test_local_cache_rereads_the_row(self):
+        self.assertEqual(get_permission_masks(self.designation.pk), {'master': ACTION_BITS['view']})
+        self.set_permissions({})
+        self.assertEqual(get_permission_masks(self.designation.pk), {})
+
+
+class ClaimsJWTAuthenticationTest(FixtureTestCase):
+    def authenticate(self):
+        refresh = RefreshToken()
+        refresh[api_settings.USER_ID_CLAIM] = self.user.USER_ID
+        refresh['username'] = self.user.USERNAME
+        refresh['is_superuser'] = self.user.IS_SUPERUSER
+        refresh['designation_id'] = self.user.DESIGNATION_id
+        authentication = ClaimsJWTAuthentication()
+        return authentication.get_user(authentication.get_validated_token(str(refresh.access_token)))
+
+    def test_claims_need_no_query(self):
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+            self.assertEqual(user.USERNAME, self.user.USERNAME)
+            self.assertEqual(str(user), self.user.USERNAME)
+            self.assertFalse(user.IS_SUPERUSER)
+            self.assertEqual(user.DESIGNATION_id, self.user.DESIGNATION_id)
+            self.assertTrue(user.is_authenticated)
+            self.assertEqual(user, self.user)
+
+    def test_other_fields_load_the_row_once(self):
+        user = self.authenticate()
+        with self.assertNumQueries(1):
+            self.assertEqual(user.EMAIL, self.user.EMAIL)
+            self.assertEqual(user.FIRST_NAME, 'Test')
+
+
+@override_settings(AUTH_THROTTLE_RATES={'otp': {'user': '2/min'}, 'otp_verify': {'user': '2/min'}})
+class AuthRateThrottleTest(FixtureTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def post(self, url, user_id='NOBODY'):
+        return APIClient().post(url, {'user_id': user_id}, format='json')
+
+    def test_bucket_refills_over_time(self):
+        with mock.patch('core.throttling.time.time', return_value=1000.0) as clock:
+            self.assertEqual(take_token('bucket', '2/min'), 0)
+            self.assertEqual(take_token('bucket', '2/min'), 0)
+            self.assertAlmostEqual(take_token('bucket', '2/min'), 30)
+
+            clock.return_value += 30
+            self.assertEqual(take_token('bucket', '2/min'), 0)
+            self.assertAlmostEqual(take_token('bucket', '2/min'), 30)
+
+    def test_empty_bucket_answers_429(self):
+        for _ in range(2):
+            self.assertNotEqual(self.post('/api/auth/send-otp/').status_code, 429)
+        with self.assertLogs('core.throttling', 'WARNING'):
+            response = self.post('/api/auth/send-otp/')
+            self.assertEqual(response.status_code, 429)
+            self.assertIn('Retry-After', response)
+
+            # Buckets are per user_id (case-insensitive)...
+            self.assertEqual(self.post('/api/auth/send-otp/', 'nobody').status_code, 429)
+        self.assertNotEqual(self.post('/api/auth/send-otp/', 'SOMEONE').status_code, 429)
+        # ...and per scope: sending codes does not use up verify attempts
+        self.assertNotEqual(self.post('/api/auth/verify-otp/').status_code, 429)
+
+
+class HierarchyListQueriesTest(FixtureTestCase):
+    """Listing a level costs the same number of queries whatever its size"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_branches(self, total):
+        program = self.hierarchy['program']
+        for number in range(BRANCH.objects.count(), total):
+            branch = BRANCH.objects.create(PROGRAM=program, NAME=f'Branch {number}', CODE=f'BR{number}')
+            year = YEAR.objects.create(BRANCH=branch, YEAR='FY')
+            SEMESTER.objects.create(YEAR=year, SEMESTER='1')
+
+    def list(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+
+    def test_branch_list(self):
+        assert_constant_queries(lambda: self.list('/api/master/branch/'), self.add_branches)
+
+    def test_year_list(self):
+        assert_constant_queries(lambda: self.list('/api/master/year/'), self.add_branches)
+
+    def test_semester_list(self):
+        assert_constant_queries(lambda: self.list('/api/master/semester/'), self.add_branches)
+
+
+class KeysetCursorTest(FixtureTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_pages_follow_the_cursor(self):
+        for number in range(3):
+            DASHBOARD_MASTER.objects.create(EMP_ID=f'E{number}', DASHBOARD_NAME=f'D{number}', INSTITUTE='IK')
+        response = self.client.get('/api/master/dashboard-master/', {'page_size': 2})
+        self.assertEqual(len(response.data['data']), 2)
+        response = self.client.get('/api/master/dashboard-master/', {'page_size': 2, 'cursor': response.data['next']})
+        self.assertEqual(len(response.data['data']), 1)
+        self.assertIsNone(response.data['next'])
+
+    def test_bad_cursors_are_rejected(self):
+        for cursor in ('not base64!', encode_cursor({'pk': 1}), encode_cursor([1]), encode_cursor(True),
+                       encode_cursor('abc')):
+            response = self.client.get('/api/master/dashboard-master/', {'cursor': cursor})
+            self.assertEqual(response.status_code, 400, cursor)
+            self.assertEqual(response.data, {'cursor': 'Invalid cursor'})
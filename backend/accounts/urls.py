@@ -36,6 +36,8 @@ urlpatterns = [
     path('auth/reset-password/', views.ResetPasswordView.as_view(), name='reset-password'),
     path('auth/logout/', LogoutView.as_view(), name='logout'),
     path('master/tables/', views.MasterTableListView.as_view(), name='master-tables'),
+    path('master/bootstrap/', views.MasterBootstrapView.as_view(), name='master-bootstrap'),
+    path('master/hierarchy/', views.AcademicHierarchyView.as_view(), name='academic-hierarchy'),
     path('api/master/academic-years', include(router.urls)),
     path('api/master/semester-duration', include(router.urls)),
     path('api/program-master/', views.ProgramTableListView.as_view(), name='program-master'),
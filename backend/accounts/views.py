@@ -1,5 +1,5 @@
 from django.shortcuts import render
-from django.core.mail import send_mail
+from utils.email_sender import queue_email
 from django.conf import settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -37,12 +37,27 @@ from django.http import JsonResponse
 from django.db import connection
 import logging  # Add this at the top with other imports
 from establishments.models import EMPLOYEE_MASTER  # Add this import
+from .lockout import remaining_attempts as remaining_login_attempts
+from .hashing import PasswordHashingBusy
+from .permissions import get_permission_masks, invalidate_designation
+from .profile import get_login_profile
+from .hierarchy import get_tree, tree_cache_key
+from core.throttling import AuthRateThrottle
+from core.master_cache import CachedListMixin
+from core.conditional import ConditionalListMixin, etag_matches, make_etag, set_validators
+from core.related import AutoRelatedMixin
+from core.fieldsets import SparseFieldsMixin
+from core.pagination import keyset_requested, paginate_keyset, paginated_response
+from core.master_cache import get_table_payload, table_keys
 
 logger = logging.getLogger(__name__)  # Add this after imports
 
 
 class LoginView(APIView):
     permission_classes = [AllowAny]  # Allow unauthenticated access
+    authentication_classes = []  # throttled before any session/user lookup
+    throttle_classes = [AuthRateThrottle]
+    throttle_scope = 'login'
     
     def post(self, request):
         print("==== Login Request ====")
@@ -86,15 +101,15 @@ class LoginView(APIView):
 
             # Verify password
             if not user.check_password(password):
-                user.increment_failed_attempts()
-                
-                remaining_attempts = 0
-                if user.FAILED_LOGIN_ATTEMPTS < 3:
-                    remaining_attempts = 3 - user.FAILED_LOGIN_ATTEMPTS
-                elif user.FAILED_LOGIN_ATTEMPTS < 5:
-                    remaining_attempts = 5 - user.FAILED_LOGIN_ATTEMPTS
-                elif user.FAILED_LOGIN_ATTEMPTS < 8:
-                    remaining_attempts = 8 - user.FAILED_LOGIN_ATTEMPTS
+                if not user.increment_failed_attempts():
+                    # A parallel attempt locked the account first
+                    is_locked, lock_message = user.is_account_locked()
+                    return Response({
+                        'status': 'error',
+                        'message': lock_message
+                    }, status=status.HTTP_403_FORBIDDEN)
+
+                remaining_attempts = remaining_login_attempts(user.FAILED_LOGIN_ATTEMPTS)
                 
                 message = "Invalid credentials. "
                 if remaining_attempts > 0:
@@ -114,7 +129,7 @@ class LoginView(APIView):
             otp = user.generate_otp()
             
             try:
-                send_mail(
+                queue_email(
                     subject='Login Verification OTP - College ERP',
                     message=(
                         f'Dear {user.FIRST_NAME},\n\n'
@@ -126,7 +141,6 @@ class LoginView(APIView):
                     ),
                     from_email=settings.DEFAULT_FROM_EMAIL,
                     recipient_list=[user.EMAIL],
-                    fail_silently=False,
                 )
                 
                 return Response({
@@ -153,6 +167,9 @@ class LoginView(APIView):
 @method_decorator(ensure_csrf_cookie, name='dispatch')
 class SendOTPView(APIView):
     permission_classes = [AllowAny]  # Allow unauthenticated access
+    authentication_classes = []  # throttled before any session/user lookup
+    throttle_classes = [AuthRateThrottle]
+    throttle_scope = 'otp'
     
     def post(self, request):
         user_id = request.data.get('user_id')
@@ -178,13 +195,13 @@ class SendOTPView(APIView):
                     'status': 'error',
                     'message': lock_message,
                     'locked': True,
-                    'lockTime': user.LOCK_EXPIRY.isoformat() if user.LOCK_EXPIRY else None
+                    'lockTime': user.LOCKED_UNTIL.isoformat() if user.LOCKED_UNTIL else None
                 }, status=status.HTTP_403_FORBIDDEN)
 
             otp = user.generate_otp()
             
             try:
-                send_mail(
+                queue_email(
                     subject='Login OTP - College ERP',
                     message=(
                         f'Dear {user.FIRST_NAME},\n\n'
@@ -196,7 +213,6 @@ class SendOTPView(APIView):
                     ),
                     from_email=settings.DEFAULT_FROM_EMAIL,
                     recipient_list=[user.EMAIL],
-                    fail_silently=False,
                 )
                 
                 return Response({
@@ -222,6 +238,9 @@ class SendOTPView(APIView):
 
 class VerifyOTPView(APIView):
     permission_classes = [AllowAny]  # Allow unauthenticated access
+    authentication_classes = []  # throttled before any session/user lookup
+    throttle_classes = [AuthRateThrottle]
+    throttle_scope = 'otp_verify'  # own buckets, so sending codes does not use up verify attempts
     
     def post(self, request):
         user_id = request.data.get('user_id')
@@ -235,45 +254,24 @@ class VerifyOTPView(APIView):
 
         try:
             user = CustomUser.objects.get(USER_ID=user_id)
-            is_valid, message = user.verify_otp(otp)
+            is_valid, message = user.verify_otp(otp, clear_on_success=True)
             
             if is_valid:
                 # Update login info
                 user.update_login_info(request.META.get('REMOTE_ADDR'))
                 
-                # Get employee details if they exist
-                try:
-                    employee = EMPLOYEE_MASTER.objects.get(EMPLOYEE_ID=user.USER_ID)
-                    department_id = employee.DEPARTMENT.DEPARTMENT_ID if employee.DEPARTMENT else None
-                    institute_id = employee.INSTITUTE.INSTITUTE_ID if employee.INSTITUTE else None
-                    institute_code = employee.INSTITUTE.CODE if employee.INSTITUTE else None
-                    emp_name = employee.EMP_NAME  # Get EMP_NAME
-                except EMPLOYEE_MASTER.DoesNotExist:
-                    department_id = None
-                    institute_id = None
-                    institute_code = None
-                    emp_name = user.FIRST_NAME  # Set default to user's FIRST_NAME
-                    
-                # Store session data with emp_name
+                # Employee, department, institute and designation details in one cached query
+                profile = get_login_profile(user.USER_ID)
                 session_data = {
-                    'user_id': user.USER_ID,
-                    'name': emp_name,  # Now emp_name will always be defined
-                    'email': user.EMAIL,
-                    'is_superuser': user.IS_SUPERUSER,
-                    'designation': {
-                        'code': user.DESIGNATION.CODE,
-                        'name': user.DESIGNATION.NAME,
-                    },
-                    'permissions': user.DESIGNATION.PERMISSIONS,
+                    **profile,
                     'last_activity': timezone.now().isoformat(),
-                    'department_id': department_id,
-                    'institute_id': institute_id,
-                    'institute_code': institute_code
                 }
                 
-                # Store all session data
+                # Store all session data; permissions are kept compiled, not as the raw JSON
                 for key, value in session_data.items():
-                    request.session[key] = value
+                    if key != 'permissions':
+                        request.session[key] = value
+                request.session['permission_masks'] = get_permission_masks(user.DESIGNATION_id)
                 
                 # Generate tokens
                 refresh = RefreshToken()
@@ -281,6 +279,7 @@ class VerifyOTPView(APIView):
                 refresh['user_id'] = user.USER_ID
                 refresh['username'] = user.USERNAME
                 refresh['is_superuser'] = user.IS_SUPERUSER
+                refresh['designation_id'] = user.DESIGNATION_id
                 
                 return Response({
                     'status': 'success',
@@ -308,6 +307,10 @@ class VerifyOTPView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 class RequestPasswordResetView(APIView):
+    authentication_classes = []  # throttled before any session/user lookup
+    throttle_classes = [AuthRateThrottle]
+    throttle_scope = 'password_reset'
+
     def post(self, request):
         user_id = request.data.get('user_id')
         
@@ -330,7 +333,7 @@ class RequestPasswordResetView(APIView):
             otp = user.generate_otp()
             
             try:
-                send_mail(
+                queue_email(
                     subject='Password Reset OTP - College ERP',
                     message=(
                         f'Dear {user.FIRST_NAME},\n\n'
@@ -342,7 +345,6 @@ class RequestPasswordResetView(APIView):
                     ),
                     from_email=settings.DEFAULT_FROM_EMAIL,
                     recipient_list=[user.EMAIL],
-                    fail_silently=False,
                 )
                 
                 return Response({
@@ -366,6 +368,10 @@ class RequestPasswordResetView(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
 
 class VerifyResetOTPView(APIView):
+    authentication_classes = []  # throttled before any session/user lookup
+    throttle_classes = [AuthRateThrottle]
+    throttle_scope = 'password_reset'
+
     def post(self, request):
         user_id = request.data.get('user_id')
         otp = request.data.get('otp')
@@ -393,6 +399,10 @@ class VerifyResetOTPView(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
 
 class ResetPasswordView(APIView):
+    authentication_classes = []  # throttled before any session/user lookup
+    throttle_classes = [AuthRateThrottle]
+    throttle_scope = 'password_reset'
+
     def post(self, request):
         user_id = request.data.get('user_id')
         otp = request.data.get('otp')
@@ -429,24 +439,40 @@ class ResetPasswordView(APIView):
                 'status': 'error',
                 'message': 'User not found'
             }, status=status.HTTP_404_NOT_FOUND)
+        except PasswordHashingBusy as e:
+            return Response({
+                'status': 'error',
+                'message': str(e)
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '5'})
+        except ValueError as e:
+            return Response({
+                'status': 'error',
+                'message': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
 
 class MasterTableListView(APIView):
     def get(self, request):
         master_tables = [
-            {"name": "country", "display_name": "Country", "endpoint": "http://localhost:8000/api/master/countries/"},
-            {"name": "state", "display_name": "State", "endpoint": "http://localhost:8000/api/master/states/"},
-            {"name": "city", "display_name": "City", "endpoint": "http://localhost:8000/api/master/cities/"},
-            {"name": "currency", "display_name": "Currency", "endpoint": "http://localhost:8000/api/master/currencies/"},
-            {"name": "language", "display_name": "Language", "endpoint": "http://localhost:8000/api/master/languages/"},
-            {"name": "designation", "display_name": "Designation", "endpoint": "http://localhost:8000/api/master/designations/"},
-            {"name": "department", "display_name": "Department", "endpoint": "http://localhost:8000/api/master/departments/"},
-            {"name": "category", "display_name": "Category", "endpoint": "http://localhost:8000/api/master/categories/"}
+            {"name": "country", "display_name": "Country", "endpoint": "/api/master/countries/"},
+            {"name": "state", "display_name": "State", "endpoint": "/api/master/states/"},
+            {"name": "city", "display_name": "City", "endpoint": "/api/master/cities/"},
+            {"name": "currency", "display_name": "Currency", "endpoint": "/api/master/currencies/"},
+            {"name": "language", "display_name": "Language", "endpoint": "/api/master/languages/"},
+            {"name": "designation", "display_name": "Designation", "endpoint": "/api/master/designations/"},
+            {"name": "department", "display_name": "Department", "endpoint": "/api/master/departments/"},
+            {"name": "category", "display_name": "Category", "endpoint": "/api/master/categories/"},
+            {"name": "bootstrap", "display_name": "All master tables", "endpoint": "/api/master/bootstrap/"}
         ]
         return Response(master_tables)
 
-class BaseModelViewSet(viewsets.ModelViewSet):
+class BaseModelViewSet(ConditionalListMixin, CachedListMixin, SparseFieldsMixin, AutoRelatedMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
+    def get_list_validators(self, request):
+        if self.cache_list:
+            return self.cached_list_validators(request)
+        return super().get_list_validators(request)
+
     def perform_create(self, serializer):
         print(f"=== Debug Create by {self.request.user.USERNAME} ===")
         # Pass values directly to serializer save
@@ -454,6 +480,7 @@ class BaseModelViewSet(viewsets.ModelViewSet):
         instance.CREATED_BY = str(self.request.user.USERNAME)
         instance.UPDATED_BY = str(self.request.user.USERNAME)
         instance.save()
+        self.bump_cached_tables()
 
     def perform_update(self, serializer):
         print(f"=== Debug Update by {self.request.user.USERNAME} ===")
@@ -461,11 +488,13 @@ class BaseModelViewSet(viewsets.ModelViewSet):
         instance = serializer.save()
         instance.UPDATED_BY = str(self.request.user.USERNAME)
         instance.save()
+        self.bump_cached_tables()
 
 # Update all ViewSets to inherit from BaseModelViewSet
 class CountryViewSet(BaseModelViewSet):
     queryset = COUNTRY.objects.all()
     serializer_class = CountrySerializer
+    cache_list = True
 
     def list(self, request, *args, **kwargs):
         countries = self.queryset.filter(IS_ACTIVE=True)
@@ -475,6 +504,7 @@ class CountryViewSet(BaseModelViewSet):
 class StateViewSet(BaseModelViewSet):
     queryset = STATE.objects.all()
     serializer_class = StateSerializer
+    cache_list = True
 
     def list(self, request, *args, **kwargs):
         states = self.queryset.filter(IS_ACTIVE=True)
@@ -484,6 +514,7 @@ class StateViewSet(BaseModelViewSet):
 class CityViewSet(BaseModelViewSet):
     queryset = CITY.objects.all()
     serializer_class = CitySerializer
+    cache_list = True
 
     def list(self, request, *args, **kwargs):
         cities = self.queryset.filter(IS_ACTIVE=True)
@@ -493,6 +524,7 @@ class CityViewSet(BaseModelViewSet):
 class CurrencyViewSet(BaseModelViewSet):
     queryset = CURRENCY.objects.all()
     serializer_class = CurrencySerializer
+    cache_list = True
 
     def list(self, request, *args, **kwargs):
         currencies = self.queryset.filter(IS_ACTIVE=True)
@@ -502,6 +534,7 @@ class CurrencyViewSet(BaseModelViewSet):
 class LanguageViewSet(BaseModelViewSet):
     queryset = LANGUAGE.objects.all()
     serializer_class = LanguageSerializer
+    cache_list = True
 
     def list(self, request, *args, **kwargs):
         languages = self.queryset.filter(IS_ACTIVE=True)
@@ -511,15 +544,25 @@ class LanguageViewSet(BaseModelViewSet):
 class DesignationViewSet(BaseModelViewSet):
     queryset = DESIGNATION.objects.all()
     serializer_class = DesignationSerializer
+    cache_list = True
 
     def list(self, request, *args, **kwargs):
         designations = self.queryset.filter(IS_ACTIVE=True)
         serializer = self.get_serializer(designations, many=True)
         return Response(serializer.data)
 
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        invalidate_designation(serializer.instance.DESIGNATION_ID)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        invalidate_designation(serializer.instance.DESIGNATION_ID)
+
 class CategoryViewSet(BaseModelViewSet):
     queryset = CATEGORY.objects.all()
     serializer_class = CategorySerializer
+    cache_list = True
 
     def create(self, request, *args, **kwargs):
         try:
@@ -586,6 +629,7 @@ class CategoryViewSet(BaseModelViewSet):
 class UniversityViewSet(BaseModelViewSet):
     queryset = UNIVERSITY.objects.all()
     serializer_class = UniversitySerializer
+    cache_list = True
 
     def list(self, request, *args, **kwargs):
         universities = self.queryset.filter(IS_ACTIVE=True)
@@ -631,6 +675,7 @@ class AcademicYearViewSet(BaseModelViewSet):
 class DepartmentViewSet(BaseModelViewSet):
     queryset = DEPARTMENT.objects.all()
     serializer_class = DepartmentSerializer
+    cache_list = True
 
     def list(self, request, *args, **kwargs):
         departments = self.queryset.filter(IS_ACTIVE=True)
@@ -700,7 +745,7 @@ from django.views import View
 class ProgramTableListView(View):
     def get(self, request):
         program_master = [  # ✅ Fixed variable name (no hyphen)
-            {"name": "program", "display_name": "Program", "api_url": "http://localhost:8000/api/master/program/"},
+            {"name": "program", "display_name": "Program", "api_url": "/api/master/program/"},
             {"name": "BRANCH_MASTER", "display_name": "Branch"},
             {"name": "YEAR_MASTER", "display_name": "Year"},
             {"name": "SEMESTER_MASTER", "display_name": "Semester"},
@@ -713,6 +758,7 @@ class ProgramTableListView(View):
 class BranchListCreateView(BaseModelViewSet):
     queryset = BRANCH.objects.all().select_related("PROGRAM") 
     serializer_class = BranchSerializer
+    etag_depends_on = cache_depends_on = (PROGRAM, INSTITUTE)  # PROGRAM_CODE, INSTITUTE_CODE
 
     def post(self, request):
         try:
@@ -755,7 +801,7 @@ class BranchListCreateView(BaseModelViewSet):
         )
     def list(self, request, *args, **kwargs):
         program_id = request.GET.get("program_id")  # Get program_id from query params
-        branches = self.queryset.filter(IS_ACTIVE=True)  # Base queryset with active branches
+        branches = self.get_queryset().filter(IS_ACTIVE=True)  # Base queryset with active branches
 
         if program_id:
             # try:
@@ -814,6 +860,7 @@ class LogoutView(APIView):
 class YearListCreateView(BaseModelViewSet):
     queryset = YEAR.objects.all().select_related("BRANCH")  # ✅ Optimize DB query
     serializer_class = YearSerializer
+    etag_depends_on = cache_depends_on = (BRANCH,)  # BRANCH_CODE, BRANCH_NAME
     
     
     
@@ -838,7 +885,7 @@ class YearListCreateView(BaseModelViewSet):
     
     def list(self, request, *args, **kwargs):
         branch_id = request.GET.get("branch_id")  # Get branch_id from query params
-        years = self.queryset  # Get base queryset of active years
+        years = self.with_related(self.queryset)  # Get base queryset of active years
 
         if branch_id:
             try:
@@ -850,12 +897,13 @@ class YearListCreateView(BaseModelViewSet):
         serializer = self.get_serializer(years, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
-class SemesterListCreateView(viewsets.ModelViewSet):
+class SemesterListCreateView(ConditionalListMixin, SparseFieldsMixin, AutoRelatedMixin, viewsets.ModelViewSet):
     """
     API endpoint for listing and creating Semester records.
     """
     queryset = SEMESTER.objects.all().select_related("YEAR")    # Sorting by year and semester
     serializer_class = SemesterSerializer
+    etag_depends_on = (YEAR, BRANCH)
    
    
     def create(self, request, *args, **kwargs):
@@ -981,13 +1029,16 @@ class DashboardMasterViewSet(BaseModelViewSet):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     def list(self, request, *args, **kwargs):
-        try:
-            institute_id = request.query_params.get('institute_id')
-            queryset = self.queryset
+        institute_id = request.query_params.get('institute_id')
+        queryset = self.queryset
 
-            if institute_id:
-                queryset = queryset.filter(INSTITUTE=institute_id)
+        if institute_id:
+            queryset = queryset.filter(INSTITUTE=institute_id)
 
+        if keyset_requested(request):
+            page, next_cursor = paginate_keyset(queryset, request)
+            return paginated_response(self.get_serializer(page, many=True).data, next_cursor)
+        try:
             serializer = self.get_serializer(queryset, many=True)
             return Response({
                 'status': 'success',
@@ -1002,6 +1053,7 @@ class DashboardMasterViewSet(BaseModelViewSet):
 class CasteListCreateView(BaseModelViewSet):
     queryset =CASTE_MASTER.objects.all()   
     serializer_class = CasteSerializer
+    cache_list = True
     
     
     def create(self, request, *args, **kwargs):
@@ -1017,6 +1069,7 @@ class CasteListCreateView(BaseModelViewSet):
 class QuotaListCreateView(BaseModelViewSet):
     queryset = QUOTA_MASTER.objects.all()
     serializer_class = QuotaSerializer
+    cache_list = True
 
     def create(self, request, *args, **kwargs):
         data = request.data
@@ -1031,6 +1084,7 @@ class QuotaListCreateView(BaseModelViewSet):
 class AdmissionListCreateView(BaseModelViewSet):
       queryset =ADMISSION_QUOTA_MASTER.objects.all()   
       serializer_class = AdmissionQuotaSerializer
+      cache_list = True
       
       def create(self, request, *args, **kwargs):
         data = request.data
@@ -1042,3 +1096,76 @@ class AdmissionListCreateView(BaseModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+# Tables MasterBootstrapView can return, by the name the frontend asks for
+BOOTSTRAP_TABLES = {
+    'country': CountryViewSet,
+    'state': StateViewSet,
+    'city': CityViewSet,
+    'currency': CurrencyViewSet,
+    'language': LanguageViewSet,
+    'designation': DesignationViewSet,
+    'category': CategoryViewSet,
+    'university': UniversityViewSet,
+    'department': DepartmentViewSet,
+    'caste': CasteListCreateView,
+    'quota': QuotaListCreateView,
+    'admission': AdmissionListCreateView,
+}
+
+
+class MasterBootstrapView(APIView):
+    """
+    Several master tables in one response, e.g. ?tables=country,state,city
+    (all of BOOTSTRAP_TABLES without it). Each table comes from its cached
+    payload and the ETag is built from the table versions, so a 304 costs
+    no query at all.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        requested = request.query_params.get('tables')
+        if requested:
+            names = list(dict.fromkeys(name.strip() for name in requested.split(',') if name.strip()))
+        else:
+            names = list(BOOTSTRAP_TABLES)
+
+        unknown = [name for name in names if name not in BOOTSTRAP_TABLES]
+        if unknown:
+            return Response({
+                'error': 'Unknown tables',
+                'message': f"Unknown tables: {', '.join(unknown)}",
+                'tables': list(BOOTSTRAP_TABLES)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        viewsets = {name: BOOTSTRAP_TABLES[name] for name in names}
+        keys = table_keys(viewsets)
+        etag = make_etag(sorted(keys.items()))
+        if etag_matches(request, etag):
+            return set_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag, None)
+
+        data = {name: get_table_payload(viewsets[name], keys[name]) for name in names}
+        return set_validators(Response(data), etag, None)
+
+
+class AcademicHierarchyView(APIView):
+    """
+    University -> institute -> program -> branch -> year -> semester as one
+    nested response; ?institute_id= returns only that institute's subtree.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        institute_id = request.query_params.get('institute_id')
+        if institute_id:
+            try:
+                institute_id = int(institute_id)
+            except ValueError:
+                return Response({"error": "Invalid Institute ID"}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            institute_id = None
+
+        key = tree_cache_key(institute_id)
+        etag = make_etag(key)
+        if etag_matches(request, etag):
+            return set_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag, None)
+        return set_validators(Response(get_tree(institute_id, key=key)), etag, None)
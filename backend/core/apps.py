@@ -1,9 +1,25 @@
+import logging
+import os
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
 
     def ready(self):
-        from .schema import create_schemas
+        from .schema import SKIP_SCHEMA_SETUP_ENV, create_schemas
+        if os.environ.get(SKIP_SCHEMA_SETUP_ENV):
+            return
         create_schemas()
+
+        from .cache import is_shared
+        if not settings.DEBUG and not is_shared():
+            logger.warning(
+                "The default cache is per-process (REDIS_URL is not set): sessions, cached lists and "
+                "invalidations are not shared between worker processes, and designation permissions are "
+                "re-read from the database every PERMISSION_CACHE_RECHECK_SECONDS"
+            )
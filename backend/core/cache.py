@@ -0,0 +1,59 @@
+"""
+Versioned cache keys.
+
+Each namespace (a table, a designation, a user profile...) has a version
+number stored in the shared cache. Cached entries are keyed with the version
+they were built from, so invalidating a namespace is a single increment and
+stale entries simply stop being read and expire on their own.
+"""
+import time
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+VERSION_TIMEOUT = None  # version counters never expire
+
+
+def is_shared():
+    """False when the default cache lives in this process, so a bump is not seen by other workers"""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def _version_key(namespace):
+    return f'version:{namespace}'
+
+
+def _initial_version():
+    # Seeded from the clock so a counter lost to eviction never reuses an old number
+    return time.time_ns() // 1_000_000
+
+
+def get_version(namespace):
+    version = cache.get(_version_key(namespace))
+    if version is None:
+        version = _initial_version()
+        if not cache.add(_version_key(namespace), version, VERSION_TIMEOUT):
+            version = cache.get(_version_key(namespace), version)
+    return version
+
+
+def get_versions(namespaces):
+    """Versions for several namespaces in one cache round-trip"""
+    keys = {namespace: _version_key(namespace) for namespace in namespaces}
+    found = cache.get_many(keys.values())
+    return {namespace: found.get(key) or get_version(namespace) for namespace, key in keys.items()}
+
+
+def bump_version(namespace):
+    try:
+        return cache.incr(_version_key(namespace))
+    except ValueError:
+        # Counter missing (evicted or never read)
+        return get_version(namespace)
+
+
+def versioned_key(namespace, *parts, version=None):
+    if version is None:
+        version = get_version(namespace)
+    return ':'.join([namespace, f'v{version}', *map(str, parts)])
@@ -0,0 +1,113 @@
+"""
+Conditional GET for list endpoints.
+
+The ETag of a list is a hash of the request path plus max(UPDATED_AT) and
+the row count of the view's filtered queryset (and of any model listed in
+`etag_depends_on`, for serializers that read related rows). That costs one
+aggregate query; when the client's If-None-Match matches, the view answers
+304 without running list() or serializing anything.
+
+The count catches hard deletes, which max(UPDATED_AT) alone would miss, so
+only If-None-Match is evaluated; Last-Modified is sent for information and
+`Cache-Control: no-cache` makes browsers revalidate instead of guessing a
+freshness lifetime from it. Writes through queryset.update() must set
+UPDATED_AT themselves, since auto_now only applies on save().
+"""
+import functools
+import hashlib
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max
+from django.utils.cache import quote_etag
+from django.utils.http import http_date, parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+CACHE_CONTROL = 'private, no-cache'
+
+
+def _has_updated_at(model):
+    try:
+        model._meta.get_field('UPDATED_AT')
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def make_etag(value):
+    """Strong ETag from the repr of anything that changes with the content"""
+    return quote_etag(hashlib.md5(repr(value).encode()).hexdigest())
+
+
+def queryset_validators(querysets, salt=''):
+    """(etag, last_modified) for a sequence of querysets, one aggregate query each"""
+    parts = [salt]
+    last_modified = None
+    for queryset in querysets:
+        row = queryset.aggregate(last=Max('UPDATED_AT'), count=Count('pk'))
+        parts.append(f"{row['last'].isoformat() if row['last'] else ''}/{row['count']}")
+        if row['last'] and (last_modified is None or row['last'] > last_modified):
+            last_modified = row['last']
+    return make_etag('|'.join(parts)), last_modified
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    response['Cache-Control'] = CACHE_CONTROL
+    return response
+
+
+def etag_matches(request, etag):
+    matches = parse_etags(request.headers.get('If-None-Match', ''))
+    return '*' in matches or etag in matches
+
+
+def conditional_list(list_method):
+    """Answer list() with 304 when the client already has the current ETag"""
+
+    @functools.wraps(list_method)
+    def wrapper(self, request, *args, **kwargs):
+        # An outer layer (e.g. around core.master_cache) already checked
+        if getattr(request, '_etag_checked', False):
+            return list_method(self, request, *args, **kwargs)
+        request._etag_checked = True
+
+        validators = self.get_list_validators(request)
+        if validators is None:
+            return list_method(self, request, *args, **kwargs)
+
+        etag, last_modified = validators
+        if etag_matches(request, etag):
+            return set_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified)
+
+        response = list_method(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            set_validators(response, etag, last_modified)
+        return response
+
+    wrapper.conditional = wrapper  # functools.wraps copies this to outer layers
+    return wrapper
+
+
+class ConditionalListMixin:
+    """
+    ETag validators and 304 responses for a viewset's list(). List related
+    models the serializer reads in `etag_depends_on`.
+    """
+    etag_depends_on = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Stay the outermost layer so a 304 skips every other one
+        if getattr(cls.list, 'conditional', None) is not cls.list:
+            cls.list = conditional_list(cls.list)
+
+    def get_list_validators(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        if not _has_updated_at(queryset.model):
+            return None
+        querysets = [queryset]
+        querysets.extend(model._default_manager.all() for model in self.etag_depends_on)
+        return queryset_validators(querysets, salt=request.get_full_path())
@@ -0,0 +1,42 @@
+from django.db import connections
+from django.db.models import sql
+
+
+def update_returning(queryset, values, returning):
+    """
+    Run queryset.update(**values) as a single UPDATE ... RETURNING statement.
+
+    Values may be plain values or expressions (F, Case, ...). Returns a list of
+    dicts keyed by the field names in `returning`, one per updated row. Works
+    on PostgreSQL and SQLite 3.35+.
+    """
+    model = queryset.model
+    query = queryset.query.chain(sql.UpdateQuery)
+    query.add_update_values(values)
+    connection = connections[queryset.db]
+    compiler = query.get_compiler(queryset.db)
+    compiler.pre_sql_setup()
+    update_sql, params = compiler.as_sql()
+    if not update_sql:
+        return []
+
+    fields = [model._meta.get_field(name) for name in returning]
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    converters = []
+    for field in fields:
+        col = field.get_col(model._meta.db_table)
+        converters.append((col, connection.ops.get_db_converters(col) + field.get_db_converters(connection)))
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'{update_sql} RETURNING {columns}', params)
+        rows = cursor.fetchall()
+
+    results = []
+    for row in rows:
+        item = {}
+        for field, (col, field_converters), value in zip(fields, converters, row):
+            for converter in field_converters:
+                value = converter(value, col, connection)
+            item[field.name] = value
+        results.append(item)
+    return results
@@ -0,0 +1,112 @@
+"""
+CSV / XLSX exports of a viewset's list.
+
+ExportMixin adds GET <list url>/export/?file_type=csv|xlsx. It takes the same
+query parameters as list(), because it goes through the viewset's
+get_queryset() and filter_queryset(). The columns are the serializer's fields,
+so ?fields= and ?exclude= (core.fieldsets) select them.
+
+Rows are read from a server-side cursor (core.streaming.iter_representations)
+and written as they arrive. A CSV goes straight into a StreamingHttpResponse.
+An XLSX is written by openpyxl in write-only mode to a temporary file, and
+that file is then streamed back. Neither format holds the result set in
+memory. Text cells that a spreadsheet would read as a formula get a leading
+apostrophe in both formats.
+"""
+import csv
+import json
+import re
+import tempfile
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+
+from core.streaming import iter_representations
+
+CSV, XLSX = 'csv', 'xlsx'
+FILE_TYPE_PARAM = 'file_type'
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Cells starting with these are evaluated as formulas by Excel and friends (CSV injection)
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# Control characters are not allowed in XLSX cells
+_ILLEGAL_XLSX = re.compile(r'[\000-\010]|[\013-\014]|[\016-\037]')
+
+
+class _Echo:
+    """File-like object for csv.writer that hands back each line instead of storing it"""
+
+    def write(self, value):
+        return value
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, (list, dict)):
+        value = json.dumps(value)
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value  # text typed by users must not run as a spreadsheet formula
+    return value
+
+
+def csv_response(columns, items, filename):
+    writer = csv.writer(_Echo())
+
+    def lines():
+        yield '\ufeff' + writer.writerow(columns)  # BOM so Excel reads the file as UTF-8
+        for item in items:
+            yield writer.writerow([_cell(item.get(column)) for column in columns])
+
+    response = StreamingHttpResponse(lines(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+def xlsx_response(columns, items, filename):
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ValidationError({FILE_TYPE_PARAM: 'XLSX export is not available; use file_type=csv'})
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(filename[:31])
+    sheet.append(columns)
+    for item in items:
+        row = []
+        for column in columns:
+            value = _cell(item.get(column))
+            row.append(_ILLEGAL_XLSX.sub('', value) if isinstance(value, str) else value)
+        sheet.append(row)
+
+    file = tempfile.TemporaryFile()
+    workbook.save(file)
+    file.seek(0)
+    return FileResponse(file, as_attachment=True, filename=f'{filename}.xlsx', content_type=XLSX_CONTENT_TYPE)
+
+
+class ExportMixin:
+    export_filename = 'export'
+    export_ordering = ()
+
+    @action(detail=False, methods=['get'], url_path='export', permission_classes=[IsAuthenticated])
+    def export(self, request, *args, **kwargs):
+        file_type = request.query_params.get(FILE_TYPE_PARAM, CSV).lower()
+        if file_type not in (CSV, XLSX):
+            raise ValidationError({FILE_TYPE_PARAM: f'Must be {CSV} or {XLSX}'})
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.export_ordering:
+            queryset = queryset.order_by(*self.export_ordering)
+        serializer = self.get_serializer()
+        columns = [name for name, field in serializer.fields.items() if not field.write_only]
+        items = iter_representations(serializer, queryset)
+
+        filename = f"{self.export_filename}-{timezone.localdate():%Y%m%d}"
+        if file_type == XLSX:
+            return xlsx_response(columns, items, filename)
+        return csv_response(columns, items, filename)
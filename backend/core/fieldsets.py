@@ -0,0 +1,129 @@
+"""
+Sparse fieldsets: ?fields=A,B,C and ?exclude=D,E on GET requests.
+
+The names are checked against the serializer's fields (unknown ones are a
+400), the serializer drops everything else, and the queryset is narrowed
+with .only() to the columns those fields read, so unused TEXT columns are
+neither transferred nor decoded, and joins no kept field reads are dropped.
+When a kept field's columns cannot be worked out (a method field without
+`values_method_columns`, a property...) the output is still narrowed but the
+query is left alone.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.relations import RelatedField
+
+FIELDS_PARAM = 'fields'
+EXCLUDE_PARAM = 'exclude'
+
+
+def _names(request, param):
+    return [name.strip() for name in request.query_params.get(param, '').split(',') if name.strip()]
+
+
+def sparse_columns(serializer, keep):
+    """Model fields for .only() that serve the kept serializer fields, or None if unknown"""
+    model = serializer.Meta.model
+    method_columns = getattr(serializer, 'values_method_columns', {})
+    columns = {model._meta.pk.name}
+    for name in keep:
+        field = serializer.fields[name]
+        if isinstance(field, serializers.SerializerMethodField):
+            if name not in method_columns:
+                return None
+            columns.update(method_columns[name])
+            continue
+        if field.source == '*':
+            return None
+        attr = field.source_attrs[0]
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete:
+            return None
+        columns.add(attr)
+    return columns
+
+
+def _join_roots(serializer, keep):
+    """First relation of each kept field that reads the related row, not just the FK column"""
+    roots = set()
+    for name in keep:
+        field = serializer.fields[name]
+        if field.source == '*':
+            continue
+        if len(field.source_attrs) > 1 or (isinstance(field, RelatedField) and not field.use_pk_only_optimization()):
+            roots.add(field.source_attrs[0])
+    return roots
+
+
+def _join_paths(joined, prefix=''):
+    """{'PROGRAM': {'INSTITUTE': {}}} -> ['PROGRAM__INSTITUTE']"""
+    paths = []
+    for name, nested in joined.items():
+        paths.extend(_join_paths(nested, f'{prefix}{name}__') if nested else [prefix + name])
+    return paths
+
+
+class SparseFieldsMixin:
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.get_sparse_fields()  # reject unknown names with 400 before the handler runs
+
+    def get_sparse_fields(self):
+        """Serializer field names to keep, or None when the request does not ask for a subset"""
+        if hasattr(self, '_sparse_fields'):
+            return self._sparse_fields
+
+        self._sparse_fields = None
+        if self.request.method not in ('GET', 'HEAD'):
+            return None
+        fields = _names(self.request, FIELDS_PARAM)
+        exclude = _names(self.request, EXCLUDE_PARAM)
+        if not fields and not exclude:
+            return None
+
+        declared = list(self.get_serializer_class()(context=self.get_serializer_context()).fields)
+        for param, names in ((FIELDS_PARAM, fields), (EXCLUDE_PARAM, exclude)):
+            unknown = [name for name in names if name not in declared]
+            if unknown:
+                raise ValidationError({param: f"Unknown fields: {', '.join(unknown)}"})
+
+        self._sparse_fields = [name for name in declared if (not fields or name in fields) and name not in exclude]
+        return self._sparse_fields
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        keep = self.get_sparse_fields()
+        if keep is not None:
+            target = serializer.child if isinstance(serializer, serializers.ListSerializer) else serializer
+            for name in list(target.fields):
+                if name not in keep:
+                    target.fields.pop(name)
+        return serializer
+
+    def get_queryset(self):
+        return self.project_fields(super().get_queryset())
+
+    def project_fields(self, queryset):
+        """queryset.only() the columns the requested fields read; unchanged without ?fields/?exclude"""
+        keep = self.get_sparse_fields()
+        if keep is None or queryset.query.select_related is True:
+            return queryset
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        if getattr(getattr(serializer, 'Meta', None), 'model', None) is not queryset.model:
+            return queryset
+        columns = sparse_columns(serializer, keep)
+        if columns is None:
+            return queryset
+        joined = queryset.query.select_related
+        if joined:
+            # Drop joins no kept field reads; the remaining FKs must not be deferred
+            roots = _join_roots(serializer, keep)
+            used = {path for path in _join_paths(joined) if path.split('__')[0] in roots}
+            queryset = queryset.select_related(None)
+            if used:
+                queryset = queryset.select_related(*used)
+        return queryset.only(*columns)
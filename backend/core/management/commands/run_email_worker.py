@@ -0,0 +1,178 @@
+import logging
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Max
+from django.utils import timezone
+
+from core.models import EMAIL_OUTBOX
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+def get_smtp_connection():
+    """One SMTP connection per worker thread, kept open between messages"""
+    connection = getattr(_local, 'connection', None)
+    if connection is None:
+        connection = get_connection(fail_silently=False)
+        connection.open()
+        _local.connection = connection
+    return connection
+
+
+def drop_smtp_connection():
+    connection = getattr(_local, 'connection', None)
+    if connection is not None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+        _local.connection = None
+
+
+def deliver(outbox_id, subject, message, from_email, recipients):
+    """Runs on a pool thread - no database access here"""
+    started = time.monotonic()
+    try:
+        EmailMessage(
+            subject=subject,
+            body=message,
+            from_email=from_email,
+            to=recipients,
+            connection=get_smtp_connection(),
+        ).send()
+        return outbox_id, None, int((time.monotonic() - started) * 1000)
+    except Exception as e:
+        # Connection is probably dead, reconnect on the next message
+        drop_smtp_connection()
+        return outbox_id, str(e), int((time.monotonic() - started) * 1000)
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2*base, 4*base ... capped"""
+    base = settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS
+    return timedelta(seconds=min(base * (2 ** max(attempts - 1, 0)), settings.EMAIL_OUTBOX_RETRY_MAX_SECONDS))
+
+
+class Command(BaseCommand):
+    help = (
+        'Deliver queued emails from the EMAIL_OUTBOX table using a thread pool. '
+        'For local testing point EMAIL_HOST/EMAIL_PORT at a debugging SMTP server, '
+        'e.g. "python -m aiosmtpd -n -l localhost:1025".'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.EMAIL_OUTBOX_WORKERS)
+        parser.add_argument('--batch-size', type=int, default=settings.EMAIL_OUTBOX_BATCH_SIZE)
+        parser.add_argument('--poll-interval', type=float, default=settings.EMAIL_OUTBOX_POLL_INTERVAL)
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit')
+        parser.add_argument('--stats', action='store_true', help='Print queue depth and send latency and exit')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.print_stats()
+            return
+
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        workers = max(options['workers'], 1)
+        logger.info(f"Email worker started with {workers} threads")
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='email-worker') as pool:
+            while self.running:
+                self.requeue_stale()
+                batch = self.claim_batch(options['batch_size'])
+                if batch:
+                    results = pool.map(lambda row: deliver(*row), batch)
+                    for outbox_id, error, duration_ms in results:
+                        self.record_result(outbox_id, error, duration_ms)
+                    logger.info(f"Email outbox: sent batch of {len(batch)}, queue depth {EMAIL_OUTBOX.objects.queue_depth()}")
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(options['poll_interval'])
+
+        logger.info("Email worker stopped")
+
+    def stop(self, *args):
+        self.running = False
+
+    def claim_batch(self, limit):
+        """Mark due messages as SENDING; SKIP LOCKED lets several workers run side by side"""
+        now = timezone.now()
+        with transaction.atomic():
+            rows = list(
+                EMAIL_OUTBOX.objects.select_for_update(skip_locked=True)
+                .filter(STATUS=EMAIL_OUTBOX.PENDING, NEXT_ATTEMPT_AT__lte=now)
+                .order_by('NEXT_ATTEMPT_AT')
+                .values_list('OUTBOX_ID', 'SUBJECT', 'MESSAGE', 'FROM_EMAIL', 'RECIPIENTS')[:limit]
+            )
+            if rows:
+                EMAIL_OUTBOX.objects.filter(OUTBOX_ID__in=[row[0] for row in rows]).update(
+                    STATUS=EMAIL_OUTBOX.SENDING,
+                    LOCKED_AT=now
+                )
+        return rows
+
+    def requeue_stale(self):
+        """Put back messages claimed by a worker that died mid-send"""
+        cutoff = timezone.now() - timedelta(seconds=settings.EMAIL_OUTBOX_LOCK_TIMEOUT)
+        EMAIL_OUTBOX.objects.filter(STATUS=EMAIL_OUTBOX.SENDING, LOCKED_AT__lt=cutoff).update(
+            STATUS=EMAIL_OUTBOX.PENDING,
+            LOCKED_AT=None
+        )
+
+    def record_result(self, outbox_id, error, duration_ms):
+        now = timezone.now()
+        if error is None:
+            # The body can hold an OTP or an initial password; drop it once delivered
+            EMAIL_OUTBOX.objects.filter(OUTBOX_ID=outbox_id).update(
+                STATUS=EMAIL_OUTBOX.SENT,
+                MESSAGE='',
+                SENT_AT=now,
+                SEND_DURATION_MS=duration_ms,
+                LOCKED_AT=None,
+                LAST_ERROR=None
+            )
+            return
+
+        outbox = EMAIL_OUTBOX.objects.get(OUTBOX_ID=outbox_id)
+        outbox.ATTEMPTS += 1
+        outbox.LAST_ERROR = error
+        outbox.LOCKED_AT = None
+        if outbox.ATTEMPTS >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            outbox.STATUS = EMAIL_OUTBOX.FAILED
+            logger.error(f"Email {outbox_id} failed permanently after {outbox.ATTEMPTS} attempts: {error}")
+        else:
+            outbox.STATUS = EMAIL_OUTBOX.PENDING
+            outbox.NEXT_ATTEMPT_AT = now + retry_delay(outbox.ATTEMPTS)
+            logger.warning(f"Email {outbox_id} attempt {outbox.ATTEMPTS} failed, retrying at {outbox.NEXT_ATTEMPT_AT}: {error}")
+        outbox.save(update_fields=['ATTEMPTS', 'LAST_ERROR', 'LOCKED_AT', 'STATUS', 'NEXT_ATTEMPT_AT'])
+
+    def print_stats(self):
+        since = timezone.now() - timedelta(hours=1)
+        sent = EMAIL_OUTBOX.objects.filter(STATUS=EMAIL_OUTBOX.SENT, SENT_AT__gte=since).aggregate(
+            count=Count('OUTBOX_ID'),
+            avg_send_ms=Avg('SEND_DURATION_MS'),
+            max_send_ms=Max('SEND_DURATION_MS'),
+            avg_queue_delay=Avg(ExpressionWrapper(F('SENT_AT') - F('CREATED_AT'), output_field=DurationField())),
+        )
+
+        self.stdout.write(f"Queue depth:          {EMAIL_OUTBOX.objects.queue_depth()}")
+        self.stdout.write(f"Failed:               {EMAIL_OUTBOX.objects.filter(STATUS=EMAIL_OUTBOX.FAILED).count()}")
+        self.stdout.write(f"Sent (last hour):     {sent['count']}")
+        self.stdout.write(f"Avg SMTP send (ms):   {sent['avg_send_ms'] or 0:.0f}")
+        self.stdout.write(f"Max SMTP send (ms):   {sent['max_send_ms'] or 0}")
+        if sent['avg_queue_delay'] is not None:
+            self.stdout.write(f"Avg queue delay (s):  {sent['avg_queue_delay'].total_seconds():.1f}")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.throttling import rejected_counts
+
+
+class Command(BaseCommand):
+    help = 'Show how many auth requests each token bucket has rejected (see AUTH_THROTTLE_RATES)'
+
+    def handle(self, *args, **options):
+        for name, count in sorted(rejected_counts().items()):
+            self.stdout.write(f"{name:<24}{count:>8}")
@@ -0,0 +1,177 @@
+"""
+In-process cache for master-data list endpoints.
+
+Dropdown tables (countries, states, designations, quotas...) are listed on
+every form but almost never change. A viewset that sets `cache_list = True`
+keeps the serialized list payload in process memory, keyed by the request
+path and the table's version from core.cache, so a hit costs one cache read
+and no query or serialization.
+
+Any save/delete of the table (or of a model in `cache_depends_on`, which
+must list every related model the serializer reads) bumps the version
+through post_save/post_delete, and BaseModelViewSet bumps it in
+perform_create/perform_update as well, which also covers writes that
+bypass signals. With the default LocMem cache the version is per process;
+set REDIS_URL so every worker sees the bump immediately.
+
+The payload key doubles as the list's ETag (cached_list_validators), so a
+conditional request for a cached list runs no aggregate query either.
+
+The same versions key whole-table payloads (table_keys/get_table_payload)
+for endpoints that return several tables at once.
+"""
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models.signals import post_delete, post_save
+from rest_framework.response import Response
+
+from core.cache import bump_version, get_versions
+from core.conditional import make_etag
+
+_payloads = OrderedDict()  # payload key -> (expires_at, data)
+_payloads_lock = threading.Lock()
+
+
+def table_namespace(model):
+    return f'table:{model._meta.label_lower}'
+
+
+def bump_table_version(model):
+    bump_version(table_namespace(model))
+
+
+def _table_changed(sender, **kwargs):
+    bump_table_version(sender)
+
+
+def watch_table(model):
+    """Bump the table version whenever a row of `model` is saved or deleted"""
+    uid = f'master_cache:{model._meta.label_lower}'
+    post_save.connect(_table_changed, sender=model, dispatch_uid=uid)
+    post_delete.connect(_table_changed, sender=model, dispatch_uid=uid)
+
+
+def _get_payload(key):
+    entry = _payloads.get(key)
+    if entry is None or entry[0] < time.monotonic():
+        return None
+    with _payloads_lock:
+        if key in _payloads:
+            _payloads.move_to_end(key)
+    return entry[1]
+
+
+def _set_payload(key, data):
+    with _payloads_lock:
+        _payloads[key] = (time.monotonic() + settings.MASTER_CACHE_TIMEOUT, data)
+        _payloads.move_to_end(key)
+        while len(_payloads) > settings.MASTER_CACHE_MAX_ENTRIES:
+            _payloads.popitem(last=False)
+
+
+def clear():
+    with _payloads_lock:
+        _payloads.clear()
+
+
+def table_keys(viewsets):
+    """{name: viewset} -> {name: payload key}, one cache round-trip for all versions"""
+    namespaces = {
+        name: [table_namespace(model) for model in viewset.cached_tables()]
+        for name, viewset in viewsets.items()
+    }
+    versions = get_versions({namespace for names in namespaces.values() for namespace in names})
+    return {
+        name: ('table', viewset.__qualname__, tuple(versions[namespace] for namespace in namespaces[name]))
+        for name, viewset in viewsets.items()
+    }
+
+
+def get_table_payload(viewset, key):
+    """The viewset's full table payload for a key from table_keys(), built on a miss"""
+    data = _get_payload(key)
+    if data is None:
+        data = viewset.build_table_payload()
+        _set_payload(key, data)
+    return data
+
+
+def cached_list(list_method):
+    """Serve a viewset's list() from the payload cache; only 200 responses are stored"""
+
+    @functools.wraps(list_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = self.cached_list_key(request)
+        data = _get_payload(key)
+        if data is not None:
+            return Response(data)
+
+        response = list_method(self, request, *args, **kwargs)
+        if isinstance(response, Response) and response.status_code == 200:
+            _set_payload(key, response.data)
+        return response
+
+    wrapper.cached = True
+    return wrapper
+
+
+class CachedListMixin:
+    """
+    Opt-in list() caching for model viewsets: set `cache_list = True`, and
+    list any related models the serializer reads in `cache_depends_on`.
+    """
+    cache_list = False
+    cache_depends_on = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not cls.cache_list or cls.queryset is None:
+            return
+        for model in cls.cached_tables():
+            watch_table(model)
+        if not getattr(cls.list, 'cached', False):
+            cls.list = cached_list(cls.list)
+
+    @classmethod
+    def cached_tables(cls):
+        return [cls.queryset.model, *cls.cache_depends_on]
+
+    @classmethod
+    def table_queryset(cls):
+        """Rows of the whole-table payload: the active ones, when the table has IS_ACTIVE"""
+        queryset = cls.queryset.all()
+        try:
+            queryset.model._meta.get_field('IS_ACTIVE')
+        except FieldDoesNotExist:
+            return queryset
+        return queryset.filter(IS_ACTIVE=True)
+
+    @classmethod
+    def build_table_payload(cls):
+        return cls.serializer_class(cls.table_queryset(), many=True).data
+
+    def cached_list_key(self, request):
+        """Payload key for this request; changes with the version of every cached table"""
+        key = getattr(request, '_cached_list_key', None)
+        if key is None:
+            namespaces = [table_namespace(model) for model in self.cached_tables()]
+            versions = get_versions(namespaces)
+            key = request._cached_list_key = (
+                type(self).__qualname__,
+                request.get_full_path(),
+                tuple(versions[namespace] for namespace in namespaces),
+            )
+        return key
+
+    def cached_list_validators(self, request):
+        """(etag, last_modified) for ConditionalListMixin from the payload key, without a query"""
+        return make_etag(self.cached_list_key(request)), None
+
+    def bump_cached_tables(self):
+        if self.cache_list:
+            bump_table_version(self.queryset.model)
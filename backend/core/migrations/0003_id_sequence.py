@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_email_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ID_SEQUENCE',
+            fields=[
+                ('NAME', models.CharField(db_column='NAME', max_length=100, primary_key=True, serialize=False)),
+                ('LAST_VALUE', models.BigIntegerField(db_column='LAST_VALUE', default=0)),
+                ('UPDATED_AT', models.DateTimeField(auto_now=True, db_column='UPDATED_AT')),
+            ],
+            options={
+                'verbose_name': 'ID Sequence',
+                'verbose_name_plural': 'ID Sequences',
+                'db_table': '"ADMIN"."ID_SEQUENCE"',
+            },
+        ),
+    ]
@@ -1,3 +1,4 @@
+import copy
 from django.db import models
 from django.conf import settings
 from django.core.exceptions import ValidationError
@@ -7,6 +8,68 @@ class SchemaModel(models.Model):
     class Meta:
         abstract = True
 
+class DirtyFieldsMixin:
+    """
+    Snapshots field values as they were loaded from the database so that
+    save() can write only the fields that actually changed, without
+    re-reading the row first.
+    """
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            attname: _snapshot(value) for attname, value in zip(field_names, values)
+            if value is not models.DEFERRED
+        }
+        return instance
+
+    def get_dirty_fields(self):
+        """Names of concrete fields changed since load (or since the last save)"""
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return [field.name for field in self._meta.concrete_fields if not field.primary_key]
+
+        dirty = []
+        for field in self._meta.concrete_fields:
+            if field.primary_key or field.attname not in self.__dict__:
+                continue
+            # Deferred fields loaded later have no snapshot; write them to be safe
+            if field.attname not in loaded or loaded[field.attname] != self.__dict__[field.attname]:
+                dirty.append(field.name)
+        return dirty
+
+    def _take_snapshot(self, field_names=None):
+        fields = self._meta.concrete_fields
+        if field_names is not None:
+            fields = [self._meta.get_field(name) for name in field_names]
+        loaded = getattr(self, '_loaded_values', None) or {}
+        for field in fields:
+            if field.attname in self.__dict__:
+                loaded[field.attname] = _snapshot(self.__dict__[field.attname])
+        self._loaded_values = loaded
+
+    def mark_saved(self, field_names):
+        """
+        Record the current values of field_names as what the database holds,
+        after they were written behind save()'s back (queryset.update()), so a
+        later save() does not write them again over concurrent updates
+        """
+        self._take_snapshot(field_names)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._take_snapshot(kwargs.get('update_fields'))
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._take_snapshot(fields)
+
+
+def _snapshot(value):
+    # JSON values can be mutated in place, keep our own copy to compare against
+    return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+
 class AuditModel(SchemaModel):
     """
     Abstract base class for audit fields that can be inherited by any model
@@ -73,3 +136,97 @@ class AuditModel(SchemaModel):
 
     class Meta:
         abstract = True
+
+
+class EmailOutboxManager(models.Manager):
+    def enqueue(self, subject, message, recipient_list, from_email=None):
+        """Queue a message for the email worker instead of sending it inline"""
+        return self.create(
+            SUBJECT=subject,
+            MESSAGE=message,
+            FROM_EMAIL=from_email or settings.DEFAULT_FROM_EMAIL,
+            RECIPIENTS=list(recipient_list),
+        )
+
+    def enqueue_many(self, datatuple):
+        """Queue (subject, message, from_email, recipient_list) tuples with one INSERT"""
+        return self.bulk_create([
+            self.model(
+                SUBJECT=subject,
+                MESSAGE=message,
+                FROM_EMAIL=from_email or settings.DEFAULT_FROM_EMAIL,
+                RECIPIENTS=list(recipient_list),
+            )
+            for subject, message, from_email, recipient_list in datatuple
+        ])
+
+    def queue_depth(self):
+        return self.filter(STATUS__in=[EMAIL_OUTBOX.PENDING, EMAIL_OUTBOX.SENDING]).count()
+
+
+class EMAIL_OUTBOX(models.Model):
+    """
+    Outgoing mail waiting to be delivered by the email worker
+    (python manage.py run_email_worker). MESSAGE is blanked once a row is
+    SENT, since bodies carry OTPs and initial passwords; rows that end up
+    FAILED keep it so they can be inspected and re-queued.
+    """
+    PENDING = 'PENDING'
+    SENDING = 'SENDING'
+    SENT = 'SENT'
+    FAILED = 'FAILED'
+
+    OUTBOX_ID = models.BigAutoField(primary_key=True, db_column='OUTBOX_ID')
+    SUBJECT = models.CharField(max_length=255, db_column='SUBJECT')
+    MESSAGE = models.TextField(db_column='MESSAGE')
+    FROM_EMAIL = models.CharField(max_length=254, null=True, blank=True, db_column='FROM_EMAIL')
+    RECIPIENTS = models.JSONField(default=list, db_column='RECIPIENTS')
+    STATUS = models.CharField(
+        max_length=10,
+        choices=[
+            (PENDING, 'Pending'),
+            (SENDING, 'Sending'),
+            (SENT, 'Sent'),
+            (FAILED, 'Failed')
+        ],
+        default=PENDING,
+        db_column='STATUS'
+    )
+    ATTEMPTS = models.IntegerField(default=0, db_column='ATTEMPTS')
+    NEXT_ATTEMPT_AT = models.DateTimeField(default=timezone.now, db_column='NEXT_ATTEMPT_AT')
+    LOCKED_AT = models.DateTimeField(null=True, blank=True, db_column='LOCKED_AT')
+    LAST_ERROR = models.TextField(null=True, blank=True, db_column='LAST_ERROR')
+    SEND_DURATION_MS = models.IntegerField(null=True, blank=True, db_column='SEND_DURATION_MS')
+    CREATED_AT = models.DateTimeField(auto_now_add=True, db_column='CREATED_AT')
+    SENT_AT = models.DateTimeField(null=True, blank=True, db_column='SENT_AT')
+
+    objects = EmailOutboxManager()
+
+    class Meta:
+        db_table = '"ADMIN"."EMAIL_OUTBOX"'
+        verbose_name = 'Email Outbox'
+        verbose_name_plural = 'Email Outbox'
+        indexes = [
+            models.Index(fields=['STATUS', 'NEXT_ATTEMPT_AT']),
+        ]
+
+    def __str__(self):
+        return f"{self.OUTBOX_ID} - {self.SUBJECT} ({self.STATUS})"
+
+
+class ID_SEQUENCE(models.Model):
+    """
+    Named counters for human-readable IDs (see core.sequences). One row per
+    ID prefix; LAST_VALUE is the last number handed out.
+    """
+    NAME = models.CharField(max_length=100, primary_key=True, db_column='NAME')
+    LAST_VALUE = models.BigIntegerField(default=0, db_column='LAST_VALUE')
+    UPDATED_AT = models.DateTimeField(auto_now=True, db_column='UPDATED_AT')
+
+    class Meta:
+        db_table = '"ADMIN"."ID_SEQUENCE"'
+        verbose_name = 'ID Sequence'
+        verbose_name_plural = 'ID Sequences'
+
+    def __str__(self):
+        return f"{self.NAME} ({self.LAST_VALUE})"
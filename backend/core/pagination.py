@@ -0,0 +1,105 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are taken in order of a unique, indexed column (`keyset_key`) with
+`WHERE key > <last key of the previous page>`, so a deep page costs the
+same as the first one, unlike OFFSET. The cursor handed back in `next` is
+that last key, base64-encoded; clients treat it as opaque.
+
+Pagination is opt-in per request: lists stay unpaginated unless the client
+sends ?page_size= or ?cursor=, so existing callers see no change. Paginated
+responses use the {status, data} envelope plus `next` (null on the last page).
+"""
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+CURSOR_PARAM = 'cursor'
+PAGE_SIZE_PARAM = 'page_size'
+
+
+def encode_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip('=')
+
+
+def _invalid_cursor():
+    return ValidationError({CURSOR_PARAM: 'Invalid cursor'})
+
+
+def decode_cursor(cursor):
+    """The key value a cursor holds; only a string or an integer is a valid key"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError):
+        raise _invalid_cursor()
+    if isinstance(value, bool) or not isinstance(value, (str, int)):
+        raise _invalid_cursor()
+    return value
+
+
+def page_size(request):
+    value = request.query_params.get(PAGE_SIZE_PARAM)
+    if not value:
+        return settings.KEYSET_PAGE_SIZE
+    try:
+        size = int(value)
+    except ValueError:
+        raise ValidationError({PAGE_SIZE_PARAM: 'Must be a number'})
+    return max(1, min(size, settings.KEYSET_MAX_PAGE_SIZE))
+
+
+def keyset_requested(request):
+    return CURSOR_PARAM in request.query_params or PAGE_SIZE_PARAM in request.query_params
+
+
+def paginate_keyset(queryset, request, key='pk'):
+    """
+    (page queryset, next cursor or None). The page's keys are read first with
+    an index-only query, then the page is selected by those keys, so the
+    page queryset can be serialized any way (instances or values()).
+    """
+    size = page_size(request)
+    queryset = queryset.order_by(key)
+    cursor = request.query_params.get(CURSOR_PARAM)
+    if cursor:
+        try:
+            queryset = queryset.filter(**{f'{key}__gt': decode_cursor(cursor)})
+        except (TypeError, ValueError):
+            raise _invalid_cursor()  # e.g. a string cursor for an integer key
+
+    keys = list(queryset.values_list(key, flat=True)[:size + 1])
+    next_cursor = encode_cursor(keys[size - 1]) if len(keys) > size else None
+    return queryset.filter(**{f'{key}__in': keys[:size]}), next_cursor
+
+
+def paginated_response(data, next_cursor):
+    return Response({
+        'status': 'success',
+        'data': data,
+        'next': next_cursor
+    })
+
+
+class KeysetPaginationMixin:
+    """
+    Opt-in keyset pagination for a viewset's default list(); views with their
+    own list() call paginate_keyset()/paginated_response() themselves.
+    """
+    keyset_key = 'pk'
+
+    def list(self, request, *args, **kwargs):
+        if not keyset_requested(request):
+            return super().list(request, *args, **kwargs)
+        page, next_cursor = paginate_keyset(self.filter_queryset(self.get_queryset()), request, self.keyset_key)
+        return paginated_response(self.serialize_page(page), next_cursor)
+
+    def serialize_page(self, queryset):
+        serialize_list = getattr(self, 'serialize_list', None)  # core.values_serializer.ValuesListMixin
+        if serialize_list is not None:
+            return serialize_list(queryset)
+        return self.get_serializer(queryset, many=True).data
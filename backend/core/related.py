@@ -0,0 +1,83 @@
+"""
+select_related / prefetch_related derived from a serializer's fields.
+
+Dotted sources such as `PROGRAM.INSTITUTE.CODE`, related fields that read
+the related row (slug/string related fields) and nested serializers each
+walk a relation per row unless the queryset joins or prefetches it. Paths
+through FK/one-to-one relations become select_related, anything through a
+reverse FK or many-to-many becomes prefetch_related. The result is
+computed once per serializer class.
+"""
+import functools
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+
+
+def _relation_path(model, attrs):
+    """('PROGRAM', 'INSTITUTE', 'CODE') -> ('PROGRAM__INSTITUTE', many?, final model)"""
+    path = []
+    many = False
+    for attr in attrs:
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            break
+        if not field.is_relation or field.related_model is None:
+            break
+        path.append(attr)
+        many = many or field.one_to_many or field.many_to_many
+        model = field.related_model
+    return '__'.join(path), many, model
+
+
+def _collect(serializer, model, prefix, select, prefetch):
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+        path, many, related_model = _relation_path(model, field.source_attrs)
+        if not path:
+            continue
+        if isinstance(field, RelatedField) and field.use_pk_only_optimization() and '__' not in path:
+            continue  # reads only <fk>_id from the row itself
+
+        full_path = prefix + path
+        if many or isinstance(field, (serializers.ListSerializer, ManyRelatedField)):
+            prefetch.add(full_path)
+        else:
+            select.add(full_path)
+            if isinstance(field, serializers.BaseSerializer):
+                _collect(field, related_model, full_path + '__', select, prefetch)
+
+
+@functools.lru_cache(maxsize=None)
+def related_paths(serializer_class):
+    """(select_related paths, prefetch_related paths) for the serializer's model"""
+    select, prefetch = set(), set()
+    _collect(serializer_class(), serializer_class.Meta.model, '', select, prefetch)
+    # 'A' is implied by 'A__B'
+    select = {path for path in select if not any(other.startswith(path + '__') for other in select)}
+    return tuple(sorted(select)), tuple(sorted(prefetch))
+
+
+def with_related(queryset, serializer_class):
+    select, prefetch = related_paths(serializer_class)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+class AutoRelatedMixin:
+    """Applies with_related() for the viewset's serializer to get_queryset()"""
+
+    def get_queryset(self):
+        return self.with_related(super().get_queryset())
+
+    def with_related(self, queryset):
+        serializer_class = self.get_serializer_class()
+        if getattr(getattr(serializer_class, 'Meta', None), 'model', None) is not queryset.model:
+            return queryset
+        return with_related(queryset, serializer_class)
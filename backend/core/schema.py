@@ -1,6 +1,10 @@
 from django.db import connection
 from django.conf import settings
 
+# Set in processes that load Django only to run code (the password hashing
+# pool) so that they do not connect to the database at startup
+SKIP_SCHEMA_SETUP_ENV = 'DJANGO_SKIP_SCHEMA_SETUP'
+
 SCHEMAS = [
     'ADMIN',
     'ACADEMIC',
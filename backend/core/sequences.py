@@ -0,0 +1,60 @@
+"""
+Counters for human-readable IDs (STU25001, EMP2025T0001, ...).
+
+Each sequence is a row in ID_SEQUENCE. reserve() bumps it with a single
+UPDATE ... RETURNING, so handing out a number is O(1) and two workers can
+never get the same one; reserving a block of N for a bulk import is the same
+single statement. A sequence that does not exist yet is created on first use,
+starting from `seed` - typically the highest number already present in the
+table the IDs go into, so switching an ID scheme over to a sequence does not
+reissue existing IDs.
+
+Numbers are not given back: a transaction that rolls back after reserving
+leaves a gap, which is fine for IDs.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.db import update_returning
+from core.models import ID_SEQUENCE
+
+
+def _bump(name, count):
+    rows = update_returning(
+        ID_SEQUENCE.objects.filter(NAME=name),
+        {'LAST_VALUE': F('LAST_VALUE') + count, 'UPDATED_AT': timezone.now()},
+        ['LAST_VALUE'],
+    )
+    return rows[0]['LAST_VALUE'] if rows else None
+
+
+def reserve(name, count=1, seed=0):
+    """
+    Reserve `count` consecutive numbers of sequence `name` and return the
+    first. `seed` (a number, or a callable computing it) is the last number
+    already used; it is only evaluated when the sequence is created.
+    """
+    last = _bump(name, count)
+    if last is None:
+        start = seed() if callable(seed) else seed
+        try:
+            with transaction.atomic():
+                ID_SEQUENCE.objects.create(NAME=name, LAST_VALUE=start)
+        except IntegrityError:
+            pass  # created by a concurrent caller
+        last = _bump(name, count)
+    return last - count + 1
+
+
+def max_suffix(values, prefix, max_digits=None):
+    """
+    Highest integer following `prefix` in values (IDs), 0 if none; for seeds.
+    Suffixes longer than max_digits belong to some other ID scheme and are
+    skipped.
+    """
+    numbers = [
+        int(suffix) for suffix in (value[len(prefix):] for value in values)
+        if suffix.isdigit() and (max_digits is None or len(suffix) <= max_digits)
+    ]
+    return max(numbers, default=0)
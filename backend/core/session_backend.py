@@ -0,0 +1,52 @@
+"""
+Write-coalescing session backend.
+
+Sessions live in the cache (shared when REDIS_URL is configured) with the
+database behind it, like Django's cached_db backend. The difference is in
+save(): with SESSION_SAVE_EVERY_REQUEST and a `last_activity` timestamp that
+changes on every request, cached_db would write the session row on every
+request. Here a save is skipped when nothing but the activity timestamp
+changed and we are still in the same SESSION_ACTIVITY_WRITE_INTERVAL bucket,
+so a polling dashboard refreshes its session at most once per interval.
+
+Keep SESSION_ACTIVITY_WRITE_INTERVAL well below SESSION_COOKIE_AGE: the
+stored expiry and last_activity are only as fresh as the last write.
+"""
+import copy
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+
+ACTIVITY_KEY = 'last_activity'
+BUCKET_KEY = '_activity_bucket'
+
+
+class SessionStore(cached_db.SessionStore):
+    def load(self):
+        data = super().load()
+        self._persisted = self._snapshot(data)
+        return data
+
+    @staticmethod
+    def _snapshot(data):
+        return copy.deepcopy({key: value for key, value in data.items() if key not in (ACTIVITY_KEY, BUCKET_KEY)})
+
+    def _activity_bucket(self):
+        return int(time.time() // settings.SESSION_ACTIVITY_WRITE_INTERVAL)
+
+    def save(self, must_create=False):
+        bucket = self._activity_bucket()
+        persisted = getattr(self, '_persisted', None)
+        if (
+            not must_create
+            and self.session_key is not None
+            and persisted is not None
+            and self._session.get(BUCKET_KEY) == bucket
+            and self._snapshot(self._session) == persisted
+        ):
+            return
+
+        self._session[BUCKET_KEY] = bucket
+        super().save(must_create=must_create)
+        self._persisted = self._snapshot(self._session)
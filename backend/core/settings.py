@@ -188,10 +188,81 @@ EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL')
 
+# Shared cache - Redis when REDIS_URL is set, otherwise per-process memory.
+# Sessions are cached here too, so run with REDIS_URL when using several worker processes.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+            'KEY_PREFIX': 'collegeERP',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'collegeERP',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+# Seconds a process trusts its compiled designation permissions before rechecking the shared version
+# (or, without REDIS_URL, the DESIGNATION row itself)
+PERMISSION_CACHE_RECHECK_SECONDS = 5
+
+LOGIN_PROFILE_CACHE_TIMEOUT = 60 * 60 * 12  # seconds
+
+# Token buckets for the auth endpoints (core.throttling), per client IP and per user_id
+AUTH_THROTTLE_RATES = {
+    'login': {'ip': '30/min', 'user': '10/min'},
+    'otp': {'ip': '30/min', 'user': '10/min'},
+    'otp_verify': {'ip': '30/min', 'user': '10/min'},
+    'password_reset': {'ip': '10/min', 'user': '5/min'},
+}
+
+# 'database' keeps the OTP in the USERS row; 'totp' derives it from a per-user secret
+# and the clock (accounts.otp) so issuing/verifying codes writes nothing to the database
+OTP_MODE = os.getenv('OTP_MODE', 'database')
+OTP_TOTP_STEP_SECONDS = 60
+OTP_TOTP_VALID_STEPS = 3  # a code stays valid for 2-3 minutes
+
+# Master-data list payloads kept in process memory (core.master_cache)
+MASTER_CACHE_TIMEOUT = 60 * 60  # seconds
+MASTER_CACHE_MAX_ENTRIES = 512
+ACADEMIC_TREE_CACHE_TIMEOUT = 60 * 60 * 12  # seconds
+
+# Keyset pagination (core.pagination), used when a list request sends ?page_size= or ?cursor=
+KEYSET_PAGE_SIZE = 100
+KEYSET_MAX_PAGE_SIZE = 1000
+
+# Rows fetched per server-side cursor round trip by streamed lists (core.streaming)
+STREAM_CHUNK_SIZE = 2000
+
+# Rows validated and written per transaction by the bulk student import (student.importer)
+STUDENT_IMPORT_CHUNK_SIZE = 500
+
+# Digits of the running number in employee IDs (EMP2025T001); more are used once it is exceeded
+EMPLOYEE_ID_SUFFIX_WIDTH = int(os.getenv('EMPLOYEE_ID_SUFFIX_WIDTH', 3))
+
+# Email outbox - views only queue mail, `python manage.py run_email_worker` delivers it
+EMAIL_OUTBOX_WORKERS = int(os.getenv('EMAIL_OUTBOX_WORKERS', 4))
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', 50))
+EMAIL_OUTBOX_POLL_INTERVAL = float(os.getenv('EMAIL_OUTBOX_POLL_INTERVAL', 1.0))  # seconds
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 5))
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = 30
+EMAIL_OUTBOX_RETRY_MAX_SECONDS = 3600
+EMAIL_OUTBOX_LOCK_TIMEOUT = 300  # seconds before a SENDING message is considered abandoned
+
+# Password hashing runs in a process pool (0 = hash inline on the request thread)
+PASSWORD_HASHING_WORKERS = int(os.getenv('PASSWORD_HASHING_WORKERS', 2))
+PASSWORD_HASHING_MAX_PENDING = int(os.getenv('PASSWORD_HASHING_MAX_PENDING', 8))  # requests allowed to wait on the pool
+PASSWORD_HASHING_QUEUE_TIMEOUT = 2.0  # seconds to wait for a slot before answering 503
+
 # JWT Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.ClaimsJWTAuthentication',  # user built from token claims, row loaded lazily
         'rest_framework.authentication.SessionAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
@@ -247,7 +318,8 @@ CSRF_COOKIE_SECURE = False  # Set to True in production
 FRONTEND_URL = 'http://localhost:3000'  # Add this if not already present
 
 # Session Settings
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+SESSION_ENGINE = 'core.session_backend'  # cache + database, writes coalesced per activity interval
+SESSION_ACTIVITY_WRITE_INTERVAL = 60  # seconds; unchanged sessions are written at most this often
 SESSION_COOKIE_AGE = 1200  # 20 minutes in seconds (changed from 3600)
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 SESSION_COOKIE_SECURE = True
@@ -0,0 +1,111 @@
+"""
+Streaming JSON for unbounded lists.
+
+JSONRenderer holds the serialized list, the JSON text and the encoded bytes
+in memory together. stream_queryset() instead reads rows from a server-side
+cursor (.iterator(chunk_size=...)) and writes the JSON array element by
+element through a StreamingHttpResponse, so memory per request is bounded
+by STREAM_CHUNK_SIZE rows whatever the size of the result. The bytes are
+the same as JSONRenderer's for the same data, including the optional
+{status, data} envelope and the escaping of U+2028/U+2029.
+
+The first chunk is built before the response is returned, so a failing
+query still raises inside the view (and its error handling). An error after
+that cannot change the 200 already sent: it is logged and the client gets a
+truncated body, which is not valid JSON.
+"""
+import itertools
+import logging
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.values_serializer import iter_values
+
+logger = logging.getLogger(__name__)
+
+# Items encoded per chunk written to the socket
+ITEMS_PER_WRITE = 200
+
+
+def _encoder():
+    return JSONEncoder(
+        ensure_ascii=not api_settings.UNICODE_JSON,
+        allow_nan=not api_settings.STRICT_JSON,
+        separators=(',', ':') if api_settings.COMPACT_JSON else (', ', ': '),
+    )
+
+
+def _json_chunks(items, envelope, key):
+    encode = _encoder().encode
+    if envelope is None:
+        head, tail = '[', ']'
+    else:
+        head = encode(envelope)[:-1] + (',' if envelope else '') + encode(key) + ':['
+        tail = ']}'
+
+    buffer = [head]
+    first = True
+    for item in items:
+        buffer.append(encode(item) if first else ',' + encode(item))
+        first = False
+        if len(buffer) >= ITEMS_PER_WRITE:
+            yield _chunk(buffer)
+            buffer = []
+    buffer.append(tail)
+    yield _chunk(buffer)
+
+
+def _chunk(buffer):
+    # As JSONRenderer: these are valid in JSON but not in JavaScript source
+    return ''.join(buffer).replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+
+def _logged(chunks):
+    try:
+        yield from chunks
+    except Exception:
+        logger.exception("Streamed response failed after the headers were sent; the body is truncated")
+        raise
+
+
+def stream_items(items, envelope=None, key='data'):
+    """
+    StreamingHttpResponse with items as a JSON array, or as
+    {**envelope, key: [...]} when an envelope dict is given. The first chunk
+    is encoded here, so errors up to that point raise in the caller.
+    """
+    chunks = _json_chunks(items, envelope, key)
+    first = next(chunks)
+    return StreamingHttpResponse(_logged(itertools.chain([first], chunks)), content_type='application/json')
+
+
+def iter_representations(serializer, queryset, chunk_size=None):
+    """
+    serializer's representation of each row of queryset, read from a
+    server-side cursor; serializer is a single (not many=True) instance,
+    e.g. view.get_serializer()
+    """
+    chunk_size = chunk_size or settings.STREAM_CHUNK_SIZE
+    items = iter_values(serializer, queryset, chunk_size)
+    if items is None:
+        items = (serializer.to_representation(obj) for obj in queryset.iterator(chunk_size=chunk_size))
+    return items
+
+
+def stream_queryset(serializer, queryset, envelope=None, key='data', chunk_size=None):
+    """stream_items() of iter_representations()"""
+    return stream_items(iter_representations(serializer, queryset, chunk_size), envelope, key)
+
+
+class StreamingListMixin:
+    """Unpaginated list() streamed with stream_queryset(); paginated lists are unchanged"""
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return stream_queryset(self.get_serializer(), queryset)
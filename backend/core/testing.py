@@ -0,0 +1,31 @@
+"""
+Query-count helpers for tests and benchmarks.
+
+    assert_constant_queries(
+        lambda: client.get('/api/master/branch/'),
+        grow=lambda n: make_branches(n),
+    )
+"""
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+def count_queries(func, *args, using=DEFAULT_DB_ALIAS, **kwargs):
+    """Number of queries func(*args, **kwargs) runs"""
+    with CaptureQueriesContext(connections[using]) as context:
+        func(*args, **kwargs)
+    return len(context)
+
+
+def assert_constant_queries(func, grow, sizes=(1, 5, 20), using=DEFAULT_DB_ALIAS):
+    """
+    Call grow(n) to bring the data up to n rows, then count func()'s queries;
+    fails unless every size runs the same number. Returns that number.
+    """
+    counts = {}
+    for size in sizes:
+        grow(size)
+        counts[size] = count_queries(func, using=using)
+    if len(set(counts.values())) > 1:
+        raise AssertionError(f"Query count grows with the number of rows: {counts}")
+    return counts[sizes[0]]
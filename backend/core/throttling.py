@@ -0,0 +1,100 @@
+"""
+Token-bucket throttling for the authentication endpoints.
+
+Buckets live in the default cache, so they are shared by every worker
+process when REDIS_URL is set. Each bucket refills continuously at the
+configured rate; a request takes one token or is rejected with 429 before
+the view (and therefore the ORM) runs. Bucket updates are read-modify-write
+on the cache, so a burst racing across processes may let a request or two
+more through - fine for brute-force protection.
+
+Limits come from settings.AUTH_THROTTLE_RATES, keyed by the view's
+`throttle_scope`, with separate buckets per client IP and per user_id.
+"""
+import logging
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'10/min' -> (10, 60)"""
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+def _rejected_key(scope, kind):
+    return f'throttle:rejected:{scope}:{kind}'
+
+
+def record_rejection(scope, kind):
+    key = _rejected_key(scope, kind)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def rejected_counts():
+    """{'login:ip': n, ...} for every configured scope"""
+    keys = {
+        f'{scope}:{kind}': _rejected_key(scope, kind)
+        for scope, rates in settings.AUTH_THROTTLE_RATES.items()
+        for kind in rates
+    }
+    found = cache.get_many(keys.values())
+    return {name: found.get(key, 0) for name, key in keys.items()}
+
+
+def take_token(key, rate):
+    """Take one token from the bucket at `key`; returns seconds to wait, or 0 if allowed"""
+    capacity, period = parse_rate(rate)
+    refill = capacity / period
+    now = time.time()
+
+    tokens, stamp = cache.get(key, (capacity, now))
+    tokens = min(capacity, tokens + (now - stamp) * refill)
+    if tokens < 1:
+        return (1 - tokens) / refill
+
+    cache.set(key, (tokens - 1, now), math.ceil(period))
+    return 0
+
+
+class AuthRateThrottle(BaseThrottle):
+    """Per-IP and per-user_id token buckets for the view's throttle_scope"""
+
+    def allow_request(self, request, view):
+        self.wait_time = None
+        scope = getattr(view, 'throttle_scope', None)
+        rates = settings.AUTH_THROTTLE_RATES.get(scope)
+        if not rates:
+            return True
+
+        idents = {'ip': self.get_ident(request)}
+        data = getattr(request, 'data', None)
+        user_id = data.get('user_id') if isinstance(data, dict) else None  # a JSON list or scalar has none
+        if user_id:
+            idents['user'] = str(user_id).upper()
+
+        for kind, ident in idents.items():
+            if kind not in rates:
+                continue
+            wait = take_token(f'throttle:{scope}:{kind}:{ident}', rates[kind])
+            if wait:
+                self.wait_time = wait
+                record_rejection(scope, kind)
+                logger.warning(f"Throttled {scope} request ({kind}={ident}), retry in {wait:.0f}s")
+                return False
+        return True
+
+    def wait(self):
+        return self.wait_time
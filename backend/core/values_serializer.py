@@ -0,0 +1,188 @@
+"""
+Read-only fast path for large list endpoints.
+
+A serializer's fields are compiled once per class into a .values()
+projection plus one converter per column, which is the field's own
+to_representation. Rows are read as dicts, so no model instances and no
+per-row field binding; the output matches serializer(queryset, many=True).data.
+
+Supported fields: concrete model fields (also through non-null FKs, e.g.
+source='PROGRAM.CODE'), primary-key and slug related fields, file fields,
+and SerializerMethodFields the serializer lists in `values_method_columns`
+({field name: (columns the method reads)}); the method then receives a
+row object with the selected columns as attributes. A serializer with any other field
+is not compiled and serialize_values() returns None, so callers fall back
+to the regular serializer. A serializer may define prepare_values(rows) to
+look things up for the whole list first.
+"""
+import functools
+import itertools
+from types import SimpleNamespace
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.relations import PrimaryKeyRelatedField, SlugRelatedField
+
+FIELD, PK, SLUG, FILE, METHOD = 'field', 'pk', 'slug', 'file', 'method'
+
+
+def _column(model, attrs):
+    """Lookup path for attrs through non-null forward FKs, and the final model field"""
+    for attr in attrs[:-1]:
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None, None
+        if not (field.many_to_one or field.one_to_one) or not field.concrete or field.null:
+            return None, None
+        model = field.related_model
+    try:
+        field = model._meta.get_field(attrs[-1])
+    except FieldDoesNotExist:
+        return None, None
+    if not field.concrete:
+        return None, None
+    return '__'.join(attrs), field
+
+
+def _compile_field(serializer_class, field):
+    model = serializer_class.Meta.model
+    method_columns = getattr(serializer_class, 'values_method_columns', {})
+
+    if isinstance(field, serializers.SerializerMethodField):
+        if field.field_name in method_columns:
+            return METHOD, tuple(method_columns[field.field_name])
+        return None
+    if field.source == '*' or isinstance(field, serializers.BaseSerializer):
+        return None
+
+    column, model_field = _column(model, field.source_attrs)
+    if column is None:
+        return None
+
+    if isinstance(field, PrimaryKeyRelatedField):
+        return (PK, column) if model_field.many_to_one or model_field.one_to_one else None
+    if isinstance(field, SlugRelatedField):
+        if not (model_field.many_to_one or model_field.one_to_one) or '.' in field.slug_field:
+            return None
+        if model_field.target_field.name == field.slug_field:
+            return SLUG, column  # the FK column already holds the slug (to_field)
+        return SLUG, f'{column}__{field.slug_field}'
+    if model_field.is_relation:
+        return None
+    if isinstance(field, serializers.FileField):
+        return FILE, column
+    return FIELD, column
+
+
+@functools.lru_cache(maxsize=None)
+def values_plan(serializer_class):
+    """((field name, kind, column or columns), ...), or None when a field is not supported"""
+    plan = []
+    for name, field in serializer_class().fields.items():
+        if field.write_only:
+            continue
+        compiled = _compile_field(serializer_class, field)
+        if compiled is None:
+            return None
+        plan.append((name, *compiled))
+    return tuple(plan)
+
+
+def _converter(serializer, name, kind):
+    field = serializer.fields[name]
+    if kind == FIELD:
+        return field.to_representation
+    if kind == PK:
+        return field.pk_field.to_representation if field.pk_field is not None else None
+    if kind == SLUG:
+        return None
+    if kind == FILE:
+        model_field = serializer.Meta.model._meta.get_field(field.source_attrs[-1])
+        return lambda name: field.to_representation(model_field.attr_class(None, model_field, name))
+    return getattr(serializer, field.method_name)
+
+
+def _compile(serializer):
+    """(columns, converters, has_methods) for this serializer instance, or None"""
+    plan = values_plan(type(serializer))
+    if plan is None:
+        return None
+    # Fields dropped from this instance (core.fieldsets) are not selected either
+    plan = [entry for entry in plan if entry[0] in serializer.fields]
+
+    columns = []
+    for _, kind, column in plan:
+        for name in (column if kind == METHOD else (column,)):
+            if name not in columns:
+                columns.append(name)
+    converters = [(name, kind, column, _converter(serializer, name, kind)) for name, kind, column in plan]
+    has_methods = any(kind == METHOD for _, kind, _ in plan)
+    return columns, converters, has_methods
+
+
+def _items(serializer, rows, converters, has_methods):
+    prepare = getattr(serializer, 'prepare_values', None)
+    if prepare is not None:
+        prepare(rows)
+
+    for row in rows:
+        instance = SimpleNamespace(**row) if has_methods else None
+        item = {}
+        for name, kind, column, convert in converters:
+            if kind == METHOD:
+                item[name] = convert(instance)
+                continue
+            value = row[column]
+            item[name] = value if value is None or convert is None else convert(value)
+        yield item
+
+
+def serialize_values(serializer, queryset):
+    """serializer(queryset, many=True).data without model instances, or None if not compiled"""
+    compiled = _compile(serializer)
+    if compiled is None:
+        return None
+    columns, converters, has_methods = compiled
+    rows = list(queryset.prefetch_related(None).values(*columns))
+    return list(_items(serializer, rows, converters, has_methods))
+
+
+def iter_values(serializer, queryset, chunk_size):
+    """
+    serialize_values() as an iterator: rows come from a server-side cursor,
+    chunk_size at a time, and prepare_values() sees one chunk at a time.
+    None if not compiled.
+    """
+    compiled = _compile(serializer)
+    if compiled is None:
+        return None
+    columns, converters, has_methods = compiled
+    rows = queryset.prefetch_related(None).values(*columns).iterator(chunk_size=chunk_size)
+
+    def generate():
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield from _items(serializer, chunk, converters, has_methods)
+
+    return generate()
+
+
+class ValuesListMixin:
+    """list() through serialize_values(), falling back to the regular serializer"""
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.serialize_list(queryset))
+
+    def serialize_list(self, queryset):
+        data = serialize_values(self.get_serializer(), queryset)
+        if data is None:
+            data = self.get_serializer(queryset, many=True).data
+        return data
@@ -13,48 +13,34 @@ logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
+AUDIT_USER_FIELDS = ('CREATED_BY', 'UPDATED_BY', 'DELETED_BY')
+
+SYSTEM_USERS = {
+    'SYSTEM': 'System',
+    'system': 'System',
+    'admin': 'Administrator',
+    'ADMIN': 'Administrator',
+}
+
+
 class BaseAuditSerializer(serializers.ModelSerializer):
     CREATED_BY_NAME = serializers.SerializerMethodField()
     UPDATED_BY_NAME = serializers.SerializerMethodField()
     DELETED_BY_NAME = serializers.SerializerMethodField()
 
+    # Columns the *_BY_NAME methods read, for core.values_serializer
+    values_method_columns = {f'{field}_NAME': (field,) for field in AUDIT_USER_FIELDS}
+
     def get_system_user_display(self, username):
         """Handle system user display names"""
-        system_users = {
-            'SYSTEM': 'System',
-            'system': 'System',
-            'admin': 'Administrator',
-            'ADMIN': 'Administrator',
-            None: 'System'
-        }
-        return system_users.get(username, username)
-
-    def get_user_display_name(self, username):
-        # Add debug logs
-        logger.debug(f"======= SERIALIZER DEBUG =======")
-        logger.debug(f"Getting display name for: {username}")
-        logger.debug(f"User type: {type(username)}")
-        
         if not username:
-            logger.debug("Username is None or empty")
             return 'System'
-            
-        # First check if it's a system user
-        system_name = self.get_system_user_display(username)
-        if (system_name != username):
-            return system_name
+        return SYSTEM_USERS.get(username, username)
 
-        try:
-            user = User.objects.filter(USERNAME=username).first()
-            logger.debug(f"Found user: {user}")
-            if user:
-                logger.debug(f"User USERNAME: {user.USERNAME}")
-                return user.USERNAME  # Return USERNAME instead of full name
-            logger.debug("No user found, returning original username")
-            return username
-        except Exception as e:
-            logger.debug(f"Error occurred: {str(e)}")
-            return username
+    def get_user_display_name(self, username):
+        # The audit columns already hold the USERNAME, which is what is displayed;
+        # only the system accounts get a friendlier name, so no user lookup is needed
+        return self.get_system_user_display(username)
 
     def get_CREATED_BY_NAME(self, obj):
         return self.get_user_display_name(obj.CREATED_BY)
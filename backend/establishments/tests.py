@@ -0,0 +1,123 @@
+import csv
+import io
+from datetime import date, time
+
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from accounts.models import DEPARTMENT, DESIGNATION
+from accounts.tests import TEST_SETTINGS, make_hierarchy, make_user
+from core.testing import assert_constant_queries
+from core.values_serializer import serialize_values
+from establishments.models import EMPLOYEE_MASTER, SHIFT_MASTER, STATUS_MASTER, TYPE_MASTER
+from establishments.serializers import EmployeeMasterSerializer
+from utils.id_generators import generate_employee_id, generate_employee_ids
+
+
+@override_settings(**TEST_SETTINGS)
+class EmployeeTestCase(TestCase):
+    """Everything an EMPLOYEE_MASTER row points at, created once per test class"""
+
+    @classmethod
+    def setUpTestData(cls):
+        hierarchy = make_hierarchy('EMP')
+        cls.related = {
+            'INSTITUTE': hierarchy['institute'],
+            'CATEGORY': hierarchy['category'],
+            'DEPARTMENT': DEPARTMENT.objects.create(INSTITUTE_CODE='IEMP', NAME='Computer', CODE='CMP'),
+            'DESIGNATION': DESIGNATION.objects.create(NAME='Teacher', CODE='TCH', PERMISSIONS={}),
+            'EMP_TYPE': TYPE_MASTER.objects.create(RECORD_WORD='Permanent'),
+            'STATUS': STATUS_MASTER.objects.create(RECORD_WORD='Active'),
+            'SHIFT': SHIFT_MASTER.objects.create(SHIFT_NAME='Day', FROM_TIME=time(9), TO_TIME=time(17)),
+        }
+
+    def make_employee(self, employee_id, number, **values):
+        fields = {
+            'EMPLOYEE_ID': employee_id, 'EMP_NAME': f'Employee {number}', 'EMAIL': f'emp{number}@example.com',
+            'SEX': 'female', 'MARITAL_STATUS': 'single', 'CREATED_BY': 'admin', 'UPDATED_BY': f'user{number}',
+            **self.related,
+        }
+        fields.update(values)
+        return EMPLOYEE_MASTER.objects.create(**fields)
+
+    def add_employees(self, total):
+        for number in range(EMPLOYEE_MASTER.objects.count(), total):
+            self.make_employee(f'EMP{number:04d}', number)
+
+
+class EmployeeListQueriesTest(EmployeeTestCase):
+    def list_employees(self, **params):
+        response = APIClient().get('/api/establishment/employees/', params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_employee_list(self):
+        assert_constant_queries(self.list_employees, self.add_employees)
+
+    def test_employee_list_with_sparse_fields(self):
+        assert_constant_queries(
+            lambda: self.list_employees(fields='EMPLOYEE_ID,DESIGNATION_NAME'), self.add_employees
+        )
+
+
+class EmployeeValuesSerializerTest(EmployeeTestCase):
+    def test_matches_the_model_serializer(self):
+        self.add_employees(2)
+        EMPLOYEE_MASTER.objects.filter(EMPLOYEE_ID='EMP0000').update(
+            DATE_OF_BIRTH=date(1990, 2, 3), PAN_NO='ABCDE1234F', PROFILE_IMAGE='employee_images/emp0000.jpg'
+        )
+        queryset = EMPLOYEE_MASTER.objects.order_by('EMPLOYEE_ID')
+
+        values = serialize_values(EmployeeMasterSerializer(), queryset)
+        self.assertIsNotNone(values)
+        self.assertEqual(
+            JSONRenderer().render(values),
+            JSONRenderer().render(EmployeeMasterSerializer(queryset, many=True).data),
+        )
+
+
+class EmployeeIdTest(EmployeeTestCase):
+    def test_sequence_skips_legacy_timestamp_ids(self):
+        make_user('EMP2030T143015')
+        self.make_employee('EMP2030T007', 1)
+
+        self.assertEqual(generate_employee_ids('Teacher', 2, year=2030), ['EMP2030T008', 'EMP2030T009'])
+        self.assertEqual(generate_employee_id('Teacher', year=2030), 'EMP2030T010')
+
+
+class EmployeeExportTest(EmployeeTestCase):
+    NAMES = ['=HYPERLINK("http://evil")', '+1+2', '-3', '@SUM(A1)', 'Asha']
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = make_user('EXPORT1')
+
+    def setUp(self):
+        for number, name in enumerate(self.NAMES):
+            self.make_employee(f'EMP{number:04d}', number, EMP_NAME=name)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def export(self, file_type):
+        response = self.client.get(
+            '/api/establishment/employees/export/', {'file_type': file_type, 'fields': 'EMPLOYEE_ID,EMP_NAME'}
+        )
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def expected_names(self):
+        return ["'" + name if name[0] in '=+-@' else name for name in self.NAMES]
+
+    def test_csv_formulas_are_escaped(self):
+        rows = list(csv.reader(io.StringIO(self.export('csv').decode('utf-8-sig'))))
+        self.assertEqual(rows[0], ['EMPLOYEE_ID', 'EMP_NAME'])
+        self.assertEqual([row[1] for row in rows[1:]], self.expected_names())
+
+    def test_xlsx_formulas_are_escaped(self):
+        from openpyxl import load_workbook
+
+        sheet = load_workbook(io.BytesIO(self.export('xlsx'))).active
+        cells = [row[1] for row in sheet.iter_rows(min_row=2, values_only=True)]
+        self.assertEqual(cells, self.expected_names())
@@ -3,13 +3,21 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.authentication import TokenAuthentication
-from django.core.mail import send_mail
+from utils.email_sender import queue_email
 from django.conf import settings
 from utils.id_generators import generate_employee_id, generate_password
 from accounts.models import CustomUser, DESIGNATION
+from accounts.hashing import PasswordHashingBusy
 from .models import TYPE_MASTER, STATUS_MASTER, SHIFT_MASTER, EMPLOYEE_MASTER, EMPLOYEE_QUALIFICATION  # Add this import
 from .serializers import TypeMasterSerializer, StatusMasterSerializer, ShiftMasterSerializer, EmployeeMasterSerializer, EmployeeQualificationSerializer
 import logging
+from core.conditional import ConditionalListMixin
+from core.related import AutoRelatedMixin
+from core.fieldsets import SparseFieldsMixin
+from core.values_serializer import ValuesListMixin
+from core.pagination import KeysetPaginationMixin
+from core.streaming import StreamingListMixin
+from core.export import ExportMixin
 from django.utils import timezone
 from django.db.models import Q
 from rest_framework.decorators import action
@@ -43,7 +51,7 @@ class EmployeeMasterTableView(APIView):
         logger.debug(f"Returning employee master tables: {master_tables}")
         return Response(master_tables)
 
-class BaseMasterViewSet(viewsets.ModelViewSet):
+class BaseMasterViewSet(ConditionalListMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     permission_classes = [AllowAny]  # Temporarily allow all access
 
     def get_username_from_request(self):
@@ -113,12 +121,15 @@ class ShiftMasterViewSet(BaseMasterViewSet):
     def get_queryset(self):
         return self.queryset.filter(IS_DELETED=False)
 
-class EmployeeViewSet(viewsets.ModelViewSet):
+class EmployeeViewSet(SparseFieldsMixin, ExportMixin, AutoRelatedMixin, KeysetPaginationMixin, StreamingListMixin, ValuesListMixin, viewsets.ModelViewSet):
     permission_classes = [AllowAny]
     serializer_class = EmployeeMasterSerializer
     queryset = EMPLOYEE_MASTER.objects.filter(IS_DELETED=False)
     lookup_field = 'EMPLOYEE_ID'
+    keyset_key = 'EMPLOYEE_ID'
     lookup_url_kwarg = 'pk'  # Add this line to map 'pk' from URL to 'EMPLOYEE_ID'
+    export_filename = 'employees'
+    export_ordering = ('EMPLOYEE_ID',)
 
     def create(self, request, *args, **kwargs):
         try:
@@ -193,12 +204,11 @@ class EmployeeViewSet(viewsets.ModelViewSet):
                 College ERP Team
                 """
 
-                send_mail(
+                queue_email(
                     email_subject,
                     email_message,
                     settings.EMAIL_HOST_USER,
                     [user.EMAIL],
-                    fail_silently=False,
                 )
 
                 return Response({
@@ -212,6 +222,10 @@ class EmployeeViewSet(viewsets.ModelViewSet):
                 logger.error(f"User creation failed: {str(user_error)}")
                 raise
 
+        except PasswordHashingBusy as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '5'})
         except Exception as e:
             logger.error(f"Error in create process: {str(e)}", exc_info=True)
             return Response({
@@ -3,10 +3,12 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.utils import timezone
 
+from core.conditional import ConditionalListMixin
+from core.fieldsets import SparseFieldsMixin
 from .models import COLLEGE_EXAM_TYPE
 from .serializers import CollegeExamTypeSerializer
 
-class CollegeExamTypeViewSet(viewsets.ModelViewSet): 
+class CollegeExamTypeViewSet(ConditionalListMixin, SparseFieldsMixin, viewsets.ModelViewSet): 
     """
     API endpoint that allows users to view or edit college exam types.
     """
@@ -0,0 +1,328 @@
+"""
+Bulk student admission import.
+
+Admissions arrive as a CSV or XLSX sheet with one student per row, using the
+same column names as StudentMasterViewSet.create (YEAR_ID is stored as
+YEAR_SEM_ID). The file is read one row at a time and handled in chunks of
+STUDENT_IMPORT_CHUNK_SIZE rows:
+
+- every row is checked with the model fields' own clean() and against lookup
+  maps of branches, years, admission quotas and categories loaded once per
+  import, so validation costs no queries per row;
+- student IDs are reserved as one block per program and batch from the
+  ID sequences (STUDENT_MASTER.allocate_student_ids);
+- passwords (the student ID, as for single admissions) are hashed in
+  parallel on the accounts.hashing pool, outside the transaction;
+- STUDENT_MASTER, STUDENT_DETAILS, STUDENT_ACADEMIC_RECORD, the user
+  accounts and the welcome emails (EMAIL_OUTBOX) are written with
+  bulk_create in one transaction per chunk.
+
+Rows that fail validation are skipped and reported with their row number;
+if a chunk fails to write, all its rows are reported and the import goes on
+with the next chunk.
+"""
+import csv
+import io
+import itertools
+import logging
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+
+from accounts.hashing import hash_passwords
+from accounts.models import ADMISSION_QUOTA_MASTER, BRANCH, CATEGORY, YEAR, CustomUser
+from utils.email_sender import queue_mass_email, student_credentials_email
+from .models import STUDENT_ACADEMIC_RECORD, STUDENT_DETAILS, STUDENT_MASTER
+from .serializers import StudentMasterSerializer
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = (
+    'INSTITUTE', 'ACADEMIC_YEAR', 'BATCH', 'ADMISSION_CATEGORY',
+    'ADMN_QUOTA_ID', 'YEAR_ID', 'FORM_NO', 'NAME', 'SURNAME', 'FATHER_NAME',
+    'GENDER', 'DOB', 'MOB_NO', 'EMAIL_ID', 'PER_ADDRESS', 'BRANCH_ID',
+)
+
+# Set by the importer, not read from the file
+_GENERATED = {'RECORD_ID', 'STUDENT_ID', 'BRANCH_ID', 'YEAR_SEM_ID', 'SEARCH_TEXT', 'CREATED_BY', 'CREATED_AT',
+              'UPDATED_BY', 'UPDATED_AT', 'DELETED_BY', 'DELETED_AT', 'IS_DELETED'}
+
+NON_FIELD_ERRORS = 'non_field_errors'
+
+
+class ImportFileError(Exception):
+    """The upload cannot be read as an admission sheet at all"""
+
+
+def _cell(value):
+    """XLSX cell -> the string a CSV would hold"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))  # phone numbers, form numbers
+    return str(value).strip()
+
+
+def _csv_rows(file):
+    reader = csv.DictReader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+    for number, row in enumerate(reader, start=2):
+        values = {column.strip(): (value or '').strip() for column, value in row.items() if column}
+        if any(values.values()):
+            yield number, values
+
+
+def _xlsx_rows(file):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFileError('XLSX import needs openpyxl; upload a CSV file instead')
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [_cell(value) for value in next(rows, ())]
+        for number, cells in enumerate(rows, start=2):
+            values = {column: _cell(value) for column, value in zip(header, cells) if column}
+            if any(values.values()):
+                yield number, values
+    finally:
+        workbook.close()
+
+
+def read_rows(file, filename):
+    """(row number, {column: value}) for each non-empty row of a CSV or XLSX upload"""
+    if filename.lower().endswith('.xlsx'):
+        return _xlsx_rows(file)
+    if filename.lower().endswith('.csv'):
+        return _csv_rows(file)
+    raise ImportFileError('Upload a .csv or .xlsx file')
+
+
+class ImportReport:
+    def __init__(self):
+        self.created = 0
+        self.errors = []  # [{'row': n, 'errors': {column: [messages]}}]
+
+    def fail(self, number, errors):
+        self.errors.append({'row': number, 'errors': errors})
+
+    def as_dict(self):
+        errors = sorted(self.errors, key=lambda error: error['row'])
+        return {'created': self.created, 'failed': len(errors), 'errors': errors}
+
+
+class Lookups:
+    """Reference data every row is checked against, loaded once per import"""
+
+    def __init__(self):
+        self.program_names = {
+            str(branch_id): program_name
+            for branch_id, program_name in BRANCH.objects.filter(IS_DELETED=False).values_list('BRANCH_ID', 'PROGRAM__NAME')
+        }
+        self.years = {str(pk) for pk in YEAR.objects.filter(IS_DELETED=False).values_list('pk', flat=True)}
+        self.quotas = {str(pk) for pk in ADMISSION_QUOTA_MASTER.objects.filter(IS_DELETED=False).values_list('pk', flat=True)}
+        self.categories = {str(pk) for pk in CATEGORY.objects.filter(IS_DELETED=False).values_list('pk', flat=True)}
+
+
+class StudentImporter:
+    def __init__(self, created_by='system', chunk_size=None):
+        self.created_by = created_by
+        self.chunk_size = chunk_size or settings.STUDENT_IMPORT_CHUNK_SIZE
+        self.lookups = Lookups()
+        self.report = ImportReport()
+        self.fields = {
+            field.name: field for field in STUDENT_MASTER._meta.concrete_fields if field.name not in _GENERATED
+        }
+        self.validate_batch = StudentMasterSerializer().validate_BATCH
+        self.usernames = set()  # written by earlier chunks of this file
+        self.emails = set()
+        self.chunk_usernames = set()  # valid rows of the chunk being imported
+        self.chunk_emails = set()
+
+    def run(self, rows):
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            raise ImportFileError('The file has no rows')
+        missing = [column for column in REQUIRED_COLUMNS if column not in first[1]]
+        if missing:
+            raise ImportFileError(f"Missing columns: {', '.join(missing)}")
+
+        rows = itertools.chain([first], rows)
+        while True:
+            chunk = list(itertools.islice(rows, self.chunk_size))
+            if not chunk:
+                return self.report
+            self.import_chunk(chunk)
+
+    def clean_row(self, values):
+        """(STUDENT_MASTER field values, errors)"""
+        errors = {}
+        cleaned = {}
+        for column in REQUIRED_COLUMNS:
+            if not values.get(column):
+                errors[column] = ['This field is required.']
+
+        for name, field in self.fields.items():
+            if name in errors or not values.get(name):
+                continue
+            try:
+                cleaned[name] = field.clean(values[name], None)
+            except ValidationError as e:
+                errors[name] = list(e.messages)
+
+        checks = (
+            ('BRANCH_ID', self.lookups.program_names, 'Invalid Branch ID'),
+            ('YEAR_ID', self.lookups.years, 'Invalid YEAR_ID'),
+            ('ADMN_QUOTA_ID', self.lookups.quotas, 'Invalid admission quota'),
+            ('ADMISSION_CATEGORY', self.lookups.categories, 'Invalid admission category'),
+        )
+        for column, known, message in checks:
+            if column not in errors and values[column] not in known:
+                errors[column] = [message]
+
+        if 'BATCH' in cleaned:
+            try:
+                cleaned['BATCH'] = self.validate_batch(cleaned['BATCH'])
+            except serializers.ValidationError as e:
+                errors['BATCH'] = [str(message) for message in e.detail]
+
+        if 'EMAIL_ID' in cleaned:
+            username = cleaned['EMAIL_ID'].split('@')[0]
+            email = cleaned['EMAIL_ID']
+            if (username in self.usernames or username in self.chunk_usernames
+                    or email in self.emails or email in self.chunk_emails):
+                errors['EMAIL_ID'] = ['Duplicate email address in this file.']
+
+        if errors:
+            return None, errors
+        cleaned['BRANCH_ID_id'] = int(values['BRANCH_ID'])
+        cleaned['YEAR_SEM_ID'] = int(values['YEAR_ID'])
+        return cleaned, None
+
+    def import_chunk(self, chunk):
+        self.chunk_usernames.clear()
+        self.chunk_emails.clear()
+        valid = []
+        for number, values in chunk:
+            cleaned, errors = self.clean_row(values)
+            if errors:
+                self.report.fail(number, errors)
+                continue
+            self.chunk_usernames.add(cleaned['EMAIL_ID'].split('@')[0])
+            self.chunk_emails.add(cleaned['EMAIL_ID'])
+            valid.append((number, cleaned))
+
+        valid = self.drop_existing_accounts(valid)
+        if not valid:
+            return
+
+        students = [
+            STUDENT_MASTER(CREATED_BY=self.created_by, UPDATED_BY=self.created_by, **cleaned)
+            for _, cleaned in valid
+        ]
+        try:
+            self.assign_student_ids(students)
+            passwords = hash_passwords(student.STUDENT_ID for student in students)
+            with transaction.atomic():
+                self.write(students, passwords)
+        except DatabaseError as e:
+            logger.error(f"Student import chunk failed: {str(e)}", exc_info=True)
+            for number, _ in valid:
+                self.report.fail(number, {NON_FIELD_ERRORS: [f"Could not be saved: {str(e)}"]})
+            return
+        # Only addresses that were saved count as taken; a failed chunk's rows may come again
+        self.usernames.update(student.EMAIL_ID.split('@')[0] for student in students)
+        self.emails.update(student.EMAIL_ID for student in students)
+        self.report.created += len(students)
+
+    def drop_existing_accounts(self, valid):
+        """Rows whose username or email already belongs to a user are reported, not imported"""
+        usernames = {cleaned['EMAIL_ID'].split('@')[0] for _, cleaned in valid}
+        emails = {cleaned['EMAIL_ID'] for _, cleaned in valid}
+        existing = CustomUser.objects.filter(Q(USERNAME__in=usernames) | Q(EMAIL__in=emails)).values_list('USERNAME', 'EMAIL')
+        taken_usernames = {username for username, _ in existing}
+        taken_emails = {email for _, email in existing}
+
+        kept = []
+        for number, cleaned in valid:
+            if cleaned['EMAIL_ID'].split('@')[0] in taken_usernames or cleaned['EMAIL_ID'] in taken_emails:
+                self.report.fail(number, {'EMAIL_ID': ['A user with this email or username already exists.']})
+            else:
+                kept.append((number, cleaned))
+        return kept
+
+    def assign_student_ids(self, students):
+        """One block of IDs per program and batch (STUDENT_MASTER.allocate_student_ids)"""
+        groups = {}
+        for student in students:
+            program_name = self.lookups.program_names[str(student.BRANCH_ID_id)]
+            groups.setdefault((program_name, student.BATCH), []).append(student)
+        for (program_name, batch), group in groups.items():
+            ids = STUDENT_MASTER.allocate_student_ids(program_name, batch, len(group))
+            for student, student_id in zip(group, ids):
+                student.STUDENT_ID = student_id
+                student.SEARCH_TEXT = student.build_search_text()  # bulk_create skips save()
+
+    def write(self, students, passwords):
+        audit = {'CREATED_BY': self.created_by, 'UPDATED_BY': self.created_by}
+        now = timezone.now()
+        STUDENT_MASTER.objects.bulk_create(students)
+        STUDENT_DETAILS.objects.bulk_create([
+            STUDENT_DETAILS(STUDENT_ID_id=student.STUDENT_ID, **audit) for student in students
+        ])
+        STUDENT_ACADEMIC_RECORD.objects.bulk_create([
+            STUDENT_ACADEMIC_RECORD(
+                STUDENT_ID=student.STUDENT_ID,
+                INSTITUTE_ID=student.INSTITUTE,
+                CATEGORY=int(student.ADMISSION_CATEGORY),
+                BATCH=student.BATCH,
+                ACADEMIC_YEAR=student.ACADEMIC_YEAR,
+                CLASS_YEAR=student.YEAR_SEM_ID,
+                ADMISSION_DATE=student.ADMISSION_DATE,
+                FORM_NO=student.FORM_NO,
+                QUOTA_ID=student.ADMN_QUOTA_ID,
+                STATUS=student.STATUS,
+                FEE_CATEGORY_ID=int(student.ADMISSION_CATEGORY),
+                **audit
+            )
+            for student in students
+        ])
+        CustomUser.objects.bulk_create([
+            CustomUser(
+                USER_ID=student.STUDENT_ID,
+                USERNAME=student.EMAIL_ID.split('@')[0],
+                EMAIL=student.EMAIL_ID,
+                PASSWORD=password,
+                PASSWORD_CHANGED_AT=now,
+                IS_ACTIVE=True,
+                IS_STAFF=False,
+                IS_SUPERUSER=False,
+                FIRST_NAME=student.NAME,
+            )
+            for student, password in zip(students, passwords)
+        ])
+        queue_mass_email([
+            (
+                *student_credentials_email(
+                    student.NAME, student.STUDENT_ID, student.EMAIL_ID.split('@')[0], student.STUDENT_ID
+                ),
+                settings.EMAIL_HOST_USER,
+                [student.EMAIL_ID],
+            )
+            for student in students
+        ])
+
+
+def import_students(file, filename, created_by='system', chunk_size=None):
+    """Import an admission sheet; returns the ImportReport"""
+    return StudentImporter(created_by, chunk_size).run(read_rows(file, filename))
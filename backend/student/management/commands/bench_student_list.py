@@ -0,0 +1,83 @@
+import time
+from datetime import date
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+
+from accounts.models import BRANCH, INSTITUTE, PROGRAM, UNIVERSITY
+from student.models import STUDENT_MASTER
+
+
+class Command(BaseCommand):
+    help = (
+        'Time GET /api/student/ (StudentMasterViewSet.list) with the regular serializer '
+        'and with the values() fast path, and check both return the same bytes. '
+        'Runs inside a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=['*']):
+            try:
+                self.create_students(options['students'])
+                client = Client()
+                results = {}
+                for mode in ('serializer', 'values'):
+                    results[mode] = self.run(client, mode, options['repeat'])
+            finally:
+                transaction.set_rollback(True)
+
+        self.stdout.write(f"{'mode':<12}{'ms/request':>14}{'bytes':>12}")
+        for mode, (elapsed, content) in results.items():
+            self.stdout.write(f"{mode:<12}{elapsed:>14.1f}{len(content):>12}")
+        same = results['serializer'][1] == results['values'][1]
+        self.stdout.write(f"identical output: {'yes' if same else 'NO'}")
+
+    def run(self, client, mode, repeat):
+        patches = []
+        if mode == 'serializer':
+            patches.append(mock.patch('core.streaming.iter_values', return_value=None))
+        for patch in patches:
+            patch.start()
+        try:
+            total = 0.0
+            for _ in range(repeat):
+                started = time.perf_counter()
+                response = client.get('/api/student/')
+                content = b''.join(response.streaming_content) if response.streaming else response.content
+                total += time.perf_counter() - started
+                if response.status_code != 200:
+                    self.stderr.write(f"Unexpected response {response.status_code}: {content[:200]}")
+        finally:
+            for patch in patches:
+                patch.stop()
+        return total * 1000 / repeat, content
+
+    def create_students(self, count):
+        university = UNIVERSITY.objects.create(
+            NAME='Bench University', CODE='BENCHU', ADDRESS='-', CONTACT_NUMBER='0',
+            EMAIL='bench-university@example.com', ESTD_YEAR=2000
+        )
+        institute = INSTITUTE.objects.create(
+            UNIVERSITY=university, NAME='Bench Institute', CODE='BENCHI', ADDRESS='-',
+            CONTACT_NUMBER='0', EMAIL='bench-institute@example.com', ESTD_YEAR=2000
+        )
+        program = PROGRAM.objects.create(
+            INSTITUTE=institute, NAME='BENCH', CODE='BENCHP', DURATION_YEARS=4, LEVEL='UG', TYPE='FT'
+        )
+        branch = BRANCH.objects.create(PROGRAM=program, NAME='Bench Branch', CODE='BENCHB')
+        STUDENT_MASTER.objects.bulk_create([
+            STUDENT_MASTER(
+                STUDENT_ID=f'BENCH{index:06d}', INSTITUTE='BENCHI', ACADEMIC_YEAR='2025-26',
+                BATCH='2029', ADMISSION_CATEGORY='GENERAL', FORM_NO=index, NAME=f'Student {index}',
+                SURNAME='Bench', FATHER_NAME='Parent', GENDER='male', DOB=date(2005, 1, 1),
+                MOB_NO='9999999999', EMAIL_ID=f'student{index}@example.com', BRANCH_ID=branch,
+            )
+            for index in range(count)
+        ], batch_size=1000)
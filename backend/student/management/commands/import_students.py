@@ -0,0 +1,46 @@
+import csv
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from student.importer import ImportFileError, import_students
+
+
+class Command(BaseCommand):
+    help = (
+        'Import an admission sheet (CSV or XLSX, one student per row) in bulk. '
+        'Rows that fail validation are skipped; --report writes them to a CSV file.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--chunk-size', type=int, default=None,
+                            help='Rows per transaction (default STUDENT_IMPORT_CHUNK_SIZE)')
+        parser.add_argument('--created-by', default='system')
+        parser.add_argument('--report', help='Write the per-row errors to this CSV file')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            with open(options['path'], 'rb') as file:
+                report = import_students(
+                    file, os.path.basename(options['path']),
+                    created_by=options['created_by'], chunk_size=options['chunk_size']
+                )
+        except (OSError, ImportFileError) as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+
+        summary = report.as_dict()
+        self.stdout.write(f"created {summary['created']}, failed {summary['failed']} in {elapsed:.1f}s")
+        if options['report']:
+            with open(options['report'], 'w', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(['row', 'errors'])
+                for error in summary['errors']:
+                    writer.writerow([error['row'], json.dumps(error['errors'])])
+        else:
+            for error in summary['errors']:
+                self.stdout.write(f"row {error['row']}: {json.dumps(error['errors'])}")
@@ -0,0 +1,73 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:15
+
+from django.db import DatabaseError, migrations, models, transaction
+from django.db.models import F, TextField, Value
+from django.db.models.functions import Coalesce, Concat, Lower
+
+SEARCH_FIELDS = ('STUDENT_ID', 'NAME', 'SURNAME', 'MOB_NO', 'EMAIL_ID')
+INDEX_NAME = 'STUDENT_MASTER_SEARCH_TEXT_trgm'
+
+
+def backfill_search_text(apps, schema_editor):
+    STUDENT_MASTER = apps.get_model('student', 'STUDENT_MASTER')
+    parts = []
+    for name in SEARCH_FIELDS:
+        parts += [Coalesce(F(name), Value('')), Value(' ')]
+    STUDENT_MASTER.objects.using(schema_editor.connection.alias).update(
+        SEARCH_TEXT=Lower(Concat(*parts[:-1], output_field=TextField()))
+    )
+
+
+def create_trigram_index(apps, schema_editor):
+    """
+    PostgreSQL only, and only if pg_trgm can be installed; student.search
+    falls back otherwise. Built CONCURRENTLY so STUDENT_MASTER stays writable
+    meanwhile, which is why this migration is not atomic.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    except DatabaseError:
+        return
+
+    # An interrupted concurrent build leaves an invalid index that IF NOT EXISTS would keep
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT NOT i.indisvalid FROM pg_index i '
+            'JOIN pg_class c ON c.oid = i.indexrelid JOIN pg_namespace n ON n.oid = c.relnamespace '
+            'WHERE n.nspname = %s AND c.relname = %s',
+            ['STUDENT', INDEX_NAME],
+        )
+        row = cursor.fetchone()
+    if row and row[0]:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "STUDENT"."{INDEX_NAME}"')
+
+    schema_editor.execute(
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{INDEX_NAME}" ON "STUDENT"."STUDENT_MASTER" '
+        f'USING gin ("SEARCH_TEXT" gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "STUDENT"."{INDEX_NAME}"')
+
+
+class Migration(migrations.Migration):
+    atomic = False  # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+
+    dependencies = [
+        ('student', '0019_student_roll_number_details'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student_master',
+            name='SEARCH_TEXT',
+            field=models.TextField(blank=True, db_column='SEARCH_TEXT', default='', editable=False),
+        ),
+        migrations.RunPython(backfill_search_text, migrations.RunPython.noop, atomic=True),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -1,6 +1,7 @@
 import os
 from django.db import models
 from core.models import AuditModel
+from core.sequences import max_suffix, reserve
 from django.utils import timezone
 from accounts.models import BRANCH, PROGRAM, INSTITUTE, SEMESTER, YEAR
 from academic.models import ACADEMIC_YEAR, EXAMINATION, CURRICULUM
@@ -188,15 +189,41 @@ class STUDENT_MASTER(AuditModel):
     LATERAL_STATUS = models.CharField(max_length=20, db_column='LATERAL_STATUS', default='NO')
     JOINING_STATUS_DATE = models.DateField(db_column='JOINING_STATUS_DATE', default=timezone.now)
     RETENTION_STATUS_DATE = models.DateField(db_column='RETENTION_STATUS_DATE', default=timezone.now)
+    # Lower-cased SEARCH_FIELDS in one trigram-indexed column, see student.search. Kept current
+    # by save() only: a QuerySet.update()/bulk_update() touching SEARCH_FIELDS must set it too
+    SEARCH_TEXT = models.TextField(db_column='SEARCH_TEXT', blank=True, default='', editable=False)
+
+    SEARCH_FIELDS = ('STUDENT_ID', 'NAME', 'SURNAME', 'MOB_NO', 'EMAIL_ID')
+
+    def build_search_text(self):
+        return ' '.join(str(getattr(self, name) or '') for name in self.SEARCH_FIELDS).lower()
+
+    @staticmethod
+    def student_id_prefix(program_name, batch):
+        return f"{program_name}{batch[-2:]}"
+
+    @classmethod
+    def allocate_student_ids(cls, program_name, batch, count=1):
+        """
+        `count` new STUDENT_IDs for a program and batch, numbered by a
+        core.sequences counter per ID prefix (seeded from existing IDs)
+        """
+        prefix = cls.student_id_prefix(program_name, batch)
+        first = reserve(
+            f'student:{prefix}', count,
+            seed=lambda: max_suffix(
+                cls.objects.filter(STUDENT_ID__startswith=prefix).values_list('STUDENT_ID', flat=True), prefix
+            ),
+        )
+        return [f"{prefix}{sequence:03d}" for sequence in range(first, first + count)]
 
     def save(self, *args, **kwargs):
         if not self.STUDENT_ID:
-            latest_entry = STUDENT_MASTER.objects.filter(
-                BATCH=self.BATCH, 
-                BRANCH_ID=self.BRANCH_ID
-            ).count() + 1
-            program_name = self.BRANCH_ID.PROGRAM.NAME
-            self.STUDENT_ID = f"{program_name}{self.BATCH[-2:]}{latest_entry:03d}"
+            self.STUDENT_ID = self.allocate_student_ids(self.BRANCH_ID.PROGRAM.NAME, self.BATCH)[0]
+        self.SEARCH_TEXT = self.build_search_text()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(self.SEARCH_FIELDS):
+            kwargs['update_fields'] = {*update_fields, 'SEARCH_TEXT'}
         super().save(*args, **kwargs)
 
     class Meta:
@@ -0,0 +1,71 @@
+"""
+Student search box.
+
+STUDENT_MASTER.SEARCH_TEXT holds the lower-cased SEARCH_FIELDS in one column,
+kept current by STUDENT_MASTER.save() and the bulk importer; writes that
+bypass save() (QuerySet.update(), bulk_update()) must set it as well, or the
+student is found under the old values. On PostgreSQL with pg_trgm that column
+has a trigram GIN index (migration 0020), so each typed term - including a
+half-typed last one - is matched as a substring through the index, and
+results are ranked by trigram similarity to the whole query. Where the extension is missing, search keeps the icontains scan over
+the individual columns; the check is repeated every RECHECK_SECONDS.
+"""
+import logging
+import time
+
+from django.db import DatabaseError, connections
+from django.db.models import Q
+
+from .models import STUDENT_MASTER
+
+logger = logging.getLogger(__name__)
+
+# How long a process trusts its answer, so installing pg_trgm or migrating
+# takes effect without a restart
+RECHECK_SECONDS = 5 * 60
+
+_trigram_checks = {}  # alias -> (checked_at, available)
+
+
+def trigram_available(alias='default'):
+    """Whether pg_trgm is installed; False (and rechecked next time) if the database cannot be asked"""
+    checked = _trigram_checks.get(alias)
+    now = time.monotonic()
+    if checked and now - checked[0] < RECHECK_SECONDS:
+        return checked[1]
+
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        available = False
+    else:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                available = cursor.fetchone() is not None
+        except DatabaseError as e:
+            logger.warning(f"Could not check for pg_trgm, searching without it: {str(e)}")
+            return False
+    _trigram_checks[alias] = (now, available)
+    return available
+
+
+def search_students(queryset, query, limit=10):
+    """Up to `limit` students of queryset matching query, best matches first"""
+    query = query.strip()
+    terms = query.lower().split()
+    if not terms:
+        return queryset.none()
+
+    if not trigram_available(queryset.db):
+        match = Q()
+        for name in STUDENT_MASTER.SEARCH_FIELDS:
+            match |= Q(**{f'{name}__icontains': query})
+        return queryset.filter(match)[:limit]
+
+    from django.contrib.postgres.search import TrigramSimilarity
+
+    for term in terms:
+        queryset = queryset.filter(SEARCH_TEXT__contains=term)
+    return queryset.annotate(
+        search_rank=TrigramSimilarity('SEARCH_TEXT', query.lower())
+    ).order_by('-search_rank', 'STUDENT_ID')[:limit]
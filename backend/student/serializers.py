@@ -25,7 +25,7 @@ BASIC_REQUIRED_FIELDS = [
 class StudentMasterSerializer(serializers.ModelSerializer):
     class Meta:
         model = STUDENT_MASTER
-        fields = '__all__'
+        exclude = ['SEARCH_TEXT']
         read_only_fields = ['STUDENT_ID']
         # Now BASIC_REQUIRED_FIELDS is accessible here
         extra_kwargs = {
@@ -1,3 +1,129 @@
-from django.test import TestCase
+import csv
+import io
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.db import DatabaseError
+
+from accounts.models import CustomUser
+from accounts.tests import FixtureTestCase
+from student import search
+from student.importer import REQUIRED_COLUMNS, StudentImporter, import_students
+from student.models import STUDENT_MASTER
+
+
+def admission_sheet(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, REQUIRED_COLUMNS)
+    writer.writeheader()
+    writer.writerows(rows)
+    return io.BytesIO(buffer.getvalue().encode())
+
+
+class StudentImportTest(FixtureTestCase):
+    def row(self, number, **values):
+        row = {
+            'INSTITUTE': self.hierarchy['institute'].CODE, 'ACADEMIC_YEAR': '2025', 'BATCH': '2030',
+            'ADMISSION_CATEGORY': self.hierarchy['category'].pk, 'ADMN_QUOTA_ID': self.hierarchy['quota'].pk,
+            'YEAR_ID': self.hierarchy['year'].pk, 'FORM_NO': number, 'NAME': f'Student{number}',
+            'SURNAME': 'Test', 'FATHER_NAME': 'Father', 'GENDER': 'male', 'DOB': '2006-01-02',
+            'MOB_NO': '9999999999', 'EMAIL_ID': f'student{number}@example.com', 'PER_ADDRESS': 'Address',
+            'BRANCH_ID': self.hierarchy['branch'].pk,
+        }
+        row.update(values)
+        return row
+
+    def test_report_lists_invalid_rows(self):
+        rows = [
+            self.row(1),
+            self.row(2, BRANCH_ID=999999),
+            self.row(3, EMAIL_ID='student1@example.com'),
+            self.row(4, NAME=''),
+            self.row(5),
+        ]
+        report = import_students(admission_sheet(rows), 'admissions.csv').as_dict()
+
+        self.assertEqual(report['created'], 2)
+        self.assertEqual([error['row'] for error in report['errors']], [3, 4, 5])
+        self.assertEqual(report['errors'][0]['errors'], {'BRANCH_ID': ['Invalid Branch ID']})
+        self.assertEqual(report['errors'][1]['errors'], {'EMAIL_ID': ['Duplicate email address in this file.']})
+        self.assertIn('NAME', report['errors'][2]['errors'])
+        self.assertEqual(STUDENT_MASTER.objects.count(), 2)
+        self.assertEqual(CustomUser.objects.filter(USERNAME__in=['student1', 'student5']).count(), 2)
+
+    def test_rows_of_a_failed_chunk_can_come_again(self):
+        rows = [self.row(1), self.row(2), self.row(3, NAME='Again', EMAIL_ID='student1@example.com')]
+        write = StudentImporter.write
+        calls = []
+
+        def fail_first_chunk(importer, students, passwords):
+            calls.append(len(students))
+            if len(calls) == 1:
+                raise DatabaseError('connection lost')
+            return write(importer, students, passwords)
+
+        with mock.patch.object(StudentImporter, 'write', fail_first_chunk), self.assertLogs('student.importer', 'ERROR'):
+            report = import_students(admission_sheet(rows), 'admissions.csv', chunk_size=2).as_dict()
+
+        self.assertEqual(report['created'], 1)
+        self.assertEqual([error['row'] for error in report['errors']], [2, 3])
+        self.assertEqual(list(STUDENT_MASTER.objects.values_list('NAME', flat=True)), ['Again'])
+
+
+class StudentTestCase(FixtureTestCase):
+    def make_student(self, **values):
+        fields = {
+            'INSTITUTE': self.hierarchy['institute'].CODE, 'ACADEMIC_YEAR': '2025', 'BATCH': '2030',
+            'ADMISSION_CATEGORY': str(self.hierarchy['category'].pk), 'FORM_NO': 1, 'NAME': 'Asha',
+            'SURNAME': 'Patil', 'FATHER_NAME': 'Ravi', 'GENDER': 'female', 'DOB': date(2006, 1, 2),
+            'MOB_NO': '9999999999', 'EMAIL_ID': 'asha@example.com', 'BRANCH_ID': self.hierarchy['branch'],
+        }
+        fields.update(values)
+        return STUDENT_MASTER.objects.create(**fields)
+
+
+class StudentIdSequenceTest(StudentTestCase):
+    def test_sequence_is_seeded_from_existing_ids(self):
+        self.make_student(STUDENT_ID='PT30007')
+        self.make_student(STUDENT_ID='PT29099', BATCH='2029', EMAIL_ID='other@example.com')
+
+        self.assertEqual(STUDENT_MASTER.allocate_student_ids('PT', '2030', 3), ['PT30008', 'PT30009', 'PT30010'])
+        self.assertEqual(STUDENT_MASTER.allocate_student_ids('PT', '2030'), ['PT30011'])
+        self.assertEqual(STUDENT_MASTER.allocate_student_ids('PT', '2029'), ['PT29100'])
+
+    def test_save_takes_the_next_id(self):
+        self.make_student(STUDENT_ID='PT30041')
+        student = self.make_student(EMAIL_ID='next@example.com')
+        self.assertEqual(student.STUDENT_ID, 'PT30042')
+
+
+class StudentSearchTest(StudentTestCase):
+    def setUp(self):
+        search._trigram_checks.clear()
+        self.addCleanup(search._trigram_checks.clear)
+        self.asha = self.make_student(STUDENT_ID='PT30001')
+        self.make_student(STUDENT_ID='PT30002', NAME='Meera', SURNAME='Joshi', EMAIL_ID='meera@example.com')
+
+    def test_icontains_fallback_without_pg_trgm(self):
+        with mock.patch.object(search, 'trigram_available', return_value=False):
+            found = list(search.search_students(STUDENT_MASTER.objects.all(), 'PATIL'))
+        self.assertEqual(found, [self.asha])
+
+    def test_blank_query_finds_nothing(self):
+        self.assertEqual(list(search.search_students(STUDENT_MASTER.objects.all(), '   ')), [])
+
+    def test_search_text_follows_partial_saves(self):
+        self.asha.NAME = 'Kavya'
+        self.asha.save(update_fields=['NAME'])
+
+        # The per-term filter of the trigram path
+        self.assertEqual(list(STUDENT_MASTER.objects.filter(SEARCH_TEXT__contains='kavya')), [self.asha])
+        self.assertFalse(STUDENT_MASTER.objects.filter(SEARCH_TEXT__contains='asha patil').exists())
+
+    def test_unreachable_database_is_not_remembered(self):
+        connection = search.connections['default']
+        with mock.patch.object(connection, 'vendor', 'postgresql'), \
+                mock.patch.object(connection, 'cursor', side_effect=DatabaseError('unreachable')), \
+                self.assertLogs('student.search', 'WARNING'):
+            self.assertFalse(search.trigram_available())
+        self.assertNotIn('default', search._trigram_checks)
@@ -4,7 +4,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.authentication import TokenAuthentication
-from django.core.mail import send_mail
+from utils.email_sender import queue_email, student_credentials_email
 from .models import STUDENT_MASTER, BRANCH, STUDENT_DETAILS, STUDENT_ACADEMIC_RECORD
 from .serializers import StudentMasterSerializer
 from .models import STUDENT_MASTER, BRANCH ,STUDENT_ROLL_NUMBER_DETAILS
@@ -16,21 +16,35 @@ from django.http import Http404
 from django.utils import timezone
 from django.db.models import Q
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
 from django.shortcuts import get_object_or_404
 from utils.id_generators import generate_student_id
 from django.contrib.auth import get_user_model
 from utils.id_generators import generate_password
 from accounts.models import DESIGNATION
 from accounts.models import CustomUser, YEAR
+from accounts.hashing import PasswordHashingBusy
 from accounts.views import BaseModelViewSet
+from core.conditional import ConditionalListMixin
+from core.related import AutoRelatedMixin
+from core.fieldsets import SparseFieldsMixin
+from core.values_serializer import ValuesListMixin
+from core.pagination import KeysetPaginationMixin, keyset_requested, paginate_keyset, paginated_response
+from core.streaming import stream_items, stream_queryset
+from core.export import ExportMixin
+from .importer import ImportFileError, import_students
+from .search import search_students
 
 
 logger = logging.getLogger(__name__)
 
-class StudentMasterViewSet(viewsets.ModelViewSet):
+class StudentMasterViewSet(ConditionalListMixin, SparseFieldsMixin, ExportMixin, ValuesListMixin, viewsets.ModelViewSet):
     queryset = STUDENT_MASTER.objects.filter(IS_DELETED=False)
     serializer_class = StudentMasterSerializer
     lookup_field = 'STUDENT_ID'  # Very important
+    export_filename = 'students'
+    export_ordering = ('STUDENT_ID',)
     
     def get_or_default(value, default=None, data_type=int):
         """Returns integer value if valid, otherwise returns default"""
@@ -52,7 +66,7 @@ class StudentMasterViewSet(viewsets.ModelViewSet):
      if academic_year:
         queryset = queryset.filter(ACADEMIC_YEAR=academic_year)
 
-     return queryset
+     return self.project_fields(queryset)
 
 
     def create(self, request, *args, **kwargs):
@@ -150,28 +164,15 @@ class StudentMasterViewSet(viewsets.ModelViewSet):
                 
 
                 # Send welcome email (optional)
-                email_subject = "Your Student Account Credentials"
-                email_message = f"""
-                Dear {request.data.get('NAME')},
-
-                Your student account has been created. Here are your login credentials:
-
-                Student ID: {student.STUDENT_ID}
-                Username: {username}
-                Password: {password}
-
-                Please change your password after first login.
-
-                Best regards,
-                College ERP Team
-                """
+                email_subject, email_message = student_credentials_email(
+                    request.data.get('NAME'), student.STUDENT_ID, username, password
+                )
 
-                send_mail(
+                queue_email(
                     email_subject,
                     email_message,
                     settings.EMAIL_HOST_USER,
                     [user.EMAIL],
-                    fail_silently=False,
                 )
 
             except Exception as user_error:
@@ -187,6 +188,11 @@ class StudentMasterViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_201_CREATED)
             
             
+        except PasswordHashingBusy as e:
+            return Response({
+                'status': 'error',
+                'message': str(e)
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '5'})
         except Exception as e:
             logger.error(f"Error creating student: {str(e)}", exc_info=True)
             return Response({
@@ -195,13 +201,12 @@ class StudentMasterViewSet(viewsets.ModelViewSet):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     def list(self, request, *args, **kwargs):
+        if keyset_requested(request):
+            students, next_cursor = paginate_keyset(self.get_queryset(), request, 'RECORD_ID')
+            return paginated_response(self.serialize_list(students), next_cursor)
         try:
             students = self.get_queryset()
-            serializer = self.get_serializer(students, many=True)
-            return Response({
-                'status': 'success',
-                'data': serializer.data
-            })
+            return stream_queryset(self.get_serializer(), students, envelope={'status': 'success'})
         except Exception as e:
             logger.error(f"Error listing students: {str(e)}", exc_info=True)
             return Response({
@@ -275,13 +280,7 @@ class StudentMasterViewSet(viewsets.ModelViewSet):
                     'message': 'Search query is required'
                 }, status=status.HTTP_400_BAD_REQUEST)
 
-            students = self.queryset.filter(
-                Q(STUDENT_ID__icontains=query) |
-                Q(NAME__icontains=query) |
-                Q(SURNAME__icontains=query) |
-                Q(MOB_NO__icontains=query) |
-                Q(EMAIL_ID__icontains=query)
-            )[:10]
+            students = search_students(self.queryset, query)
 
             serializer = self.get_serializer(students, many=True)
             return Response({
@@ -297,14 +296,38 @@ class StudentMasterViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
             
+    @action(detail=False, methods=['post'], url_path='import', permission_classes=[IsAuthenticated],
+            parser_classes=[MultiPartParser])
+    def import_students(self, request):
+        """
+        Bulk admission: a CSV or XLSX file in `file`, one student per row.
+        Returns how many were created and the errors of the rows that were not.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({
+                'status': 'error',
+                'message': 'Upload the admission sheet as "file"'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            report = import_students(upload, upload.name, created_by=str(request.user.USERNAME))
+        except ImportFileError as e:
+            return Response({'status': 'error', 'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except PasswordHashingBusy as e:
+            return Response({
+                'status': 'error',
+                'message': str(e)
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '5'})
+        return Response({'status': 'success', 'data': report.as_dict()})
+
     @action(detail=False, methods=['get'], url_path='student-ids')
     def student_ids(self, request):
         try:
             student_ids = STUDENT_MASTER.objects.filter(IS_ACTIVE='YES').values_list('STUDENT_ID', flat=True)
-            return Response({
-                'status': 'success',
-                'data': list(student_ids)
-            })
+            return stream_items(
+                student_ids.iterator(chunk_size=settings.STREAM_CHUNK_SIZE),
+                envelope={'status': 'success'}
+            )
         except Exception as e:
             logger.error(f"Error fetching student IDs: {str(e)}")
             return Response({
@@ -314,7 +337,7 @@ class StudentMasterViewSet(viewsets.ModelViewSet):
     
 
 
-class StudentRollNumberDetailsViewSet(viewsets.ModelViewSet):
+class StudentRollNumberDetailsViewSet(ConditionalListMixin, SparseFieldsMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = STUDENT_ROLL_NUMBER_DETAILS.objects.all()
     serializer_class = StudentRollNumberDetailsSerializer
 
@@ -403,9 +426,24 @@ from rest_framework.viewsets import ModelViewSet
 from .models import STUDENT_DOCUMENTS
 from .serializers import StudentDocumentsSerializer
 
-class StudentDocumentsViewSet(ModelViewSet):  # or BaseModelViewSet if customized
+class StudentDocumentsViewSet(ConditionalListMixin, SparseFieldsMixin, ExportMixin, AutoRelatedMixin, KeysetPaginationMixin, ModelViewSet):  # or BaseModelViewSet if customized
     queryset = STUDENT_DOCUMENTS.objects.all()
     serializer_class = StudentDocumentsSerializer
+    etag_depends_on = (CHECK_LIST_DOCUMENTS,)
+    export_filename = 'document-status'
+    export_ordering = ('STUDENT_ID', 'DOCUMENT_ID')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        branch_id = self.request.query_params.get('branch_id')
+        academic_year = self.request.query_params.get('academic_year')
+        if branch_id:
+            if not branch_id.isdigit():
+                raise ValidationError({'branch_id': 'Must be a number'})
+            queryset = queryset.filter(STUDENT_ID__BRANCH_ID=int(branch_id))
+        if academic_year:
+            queryset = queryset.filter(ACADEMIC_YEAR=academic_year)
+        return queryset
 
     def create(self, request, *args, **kwargs):
         data = request.data
@@ -446,6 +484,6 @@ def return_documents(request):
     STUDENT_DOCUMENTS.objects.filter(
         STUDENT_ID=student_id,
         DOCUMENT_ID__in=document_ids
-    ).update(RETURN='Y')
+    ).update(RETURN='Y', UPDATED_AT=timezone.now())  # update() skips auto_now; the list ETag reads it
 
     return Response({'message': 'Documents marked as returned'})
@@ -1,5 +1,48 @@
-from django.core.mail import send_mail
+import logging
+
 from django.conf import settings
+from core.models import EMAIL_OUTBOX
+
+logger = logging.getLogger(__name__)
+
+def queue_email(subject, message, from_email, recipient_list):
+    """
+    Queue an email for delivery by the email worker.
+    Same arguments as django.core.mail.send_mail.
+    Returns immediately - the SMTP round trip happens in run_email_worker.
+    """
+    return EMAIL_OUTBOX.objects.enqueue(
+        subject=subject,
+        message=message,
+        recipient_list=recipient_list,
+        from_email=from_email,
+    )
+
+def queue_mass_email(datatuple):
+    """
+    Queue many emails at once, like django.core.mail.send_mass_mail:
+    datatuple holds (subject, message, from_email, recipient_list) tuples.
+    """
+    return EMAIL_OUTBOX.objects.enqueue_many(datatuple)
+
+def student_credentials_email(name, student_id, username, password):
+    """(subject, message) of the welcome email for a new student account"""
+    subject = "Your Student Account Credentials"
+    message = f"""
+    Dear {name},
+
+    Your student account has been created. Here are your login credentials:
+
+    Student ID: {student_id}
+    Username: {username}
+    Password: {password}
+
+    Please change your password after first login.
+
+    Best regards,
+    College ERP Team
+    """
+    return subject, message
 
 def send_credentials_email(email, employee_id, username, password):
     subject = 'Your College ERP Account Credentials'
@@ -20,14 +63,13 @@ def send_credentials_email(email, employee_id, username, password):
     """
     
     try:
-        send_mail(
+        queue_email(
             subject=subject,
             message=message,
             from_email=settings.EMAIL_HOST_USER,
             recipient_list=[email],
-            fail_silently=False,
         )
         return True
     except Exception as e:
-        print(f"Error sending email: {str(e)}")
+        logger.error(f"Error queueing credentials email for {employee_id}: {str(e)}", exc_info=True)
         return False
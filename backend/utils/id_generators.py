@@ -1,63 +1,46 @@
+import itertools
 import random
 import string
 from datetime import datetime
+from django.conf import settings
 from accounts.models import CustomUser
 from django.db import transaction
+from core.sequences import max_suffix, reserve
 from student.models import STUDENT_MASTER
 
-def generate_employee_id(designation_name, year=None):
+def employee_id_prefix(designation_name, year=None):
+    """EMP{YEAR}{first letter of the designation}"""
     if year is None:
         year = datetime.now().year
-    
-    # Get first letter of designation in uppercase
-    designation_code = designation_name[0].upper()
-    
-    # Base format: EMP{YEAR}{DESIGNATION_CODE}
-    base_id = f"EMP{year}{designation_code}"
-    
-    # Debug log
-    print(f"Generating ID with base: {base_id}")
-    
-    try:
-        # Get ALL existing IDs with this pattern, including inactive/deleted users
-        existing_ids = CustomUser.objects.filter(
-            USER_ID__startswith=base_id
-        ).values_list('USER_ID', flat=True)
-        
-        # Debug log
-        print(f"Found existing IDs: {existing_ids}")
-        
-        if not existing_ids:
-            new_id = f"{base_id}001"
-            print(f"First ID in sequence: {new_id}")
-            return new_id
-        
-        # Extract sequence numbers and find max
-        sequences = []
-        for id in existing_ids:
-            try:
-                seq_num = int(id[-3:])  # Get last 3 digits
-                sequences.append(seq_num)
-            except ValueError:
-                continue
-        
-        if sequences:
-            next_sequence = max(sequences) + 1
-        else:
-            next_sequence = 1
-            
-        # Debug log
-        print(f"Next sequence number: {next_sequence}")
-        
-        # Format with leading zeros
-        new_id = f"{base_id}{next_sequence:03d}"
-        print(f"Generated new ID: {new_id}")
-        return new_id
-        
-    except Exception as e:
-        print(f"Error generating ID: {str(e)}")
-        # Fallback to timestamp-based ID if something goes wrong
-        return f"{base_id}{datetime.now().strftime('%H%M%S')}"
+    return f"EMP{year}{designation_name[0].upper()}"
+
+def generate_employee_ids(designation_name, count, year=None):
+    """
+    Reserve `count` employee IDs in one step (bulk onboarding). Numbers come
+    from a core.sequences counter per year and designation code, seeded from
+    the highest ID already issued, and are zero-padded to
+    EMPLOYEE_ID_SUFFIX_WIDTH digits (wider numbers are not truncated).
+    Legacy IDs that end in a timestamp (EMP2024T143015) are not counted
+    when seeding.
+    """
+    from establishments.models import EMPLOYEE_MASTER
+
+    prefix = employee_id_prefix(designation_name, year)
+    width = settings.EMPLOYEE_ID_SUFFIX_WIDTH
+
+    def seed():
+        # IDs issued before the counter existed, including inactive/deleted users
+        issued = itertools.chain(
+            CustomUser.objects.filter(USER_ID__startswith=prefix).values_list('USER_ID', flat=True),
+            EMPLOYEE_MASTER.objects.filter(EMPLOYEE_ID__startswith=prefix).values_list('EMPLOYEE_ID', flat=True),
+        )
+        return max_suffix(issued, prefix, max_digits=max(3, width))
+
+    first = reserve(f'employee:{prefix}', count, seed=seed)
+    return [f"{prefix}{sequence:0{width}d}" for sequence in range(first, first + count)]
+
+def generate_employee_id(designation_name, year=None):
+    return generate_employee_ids(designation_name, 1, year)[0]
 
 def generate_password(length=10):
     # Define character sets
@@ -94,23 +77,14 @@ def generate_student_id(program_code: str, batch: str) -> str:
     001: Sequential number
     """
     from student.models import STUDENT_MASTER
-    
+
     # Take first 3 chars of program code and convert to uppercase
-    prefix = program_code[:3].upper()
-    
-    # Get last student ID for this program and batch
-    last_student = STUDENT_MASTER.objects.filter(
-        STUDENT_ID__startswith=f"{prefix}{batch}S"
-    ).order_by('-STUDENT_ID').first()
-    
-    if last_student:
-        # Extract sequence number and increment
-        last_seq = int(last_student.STUDENT_ID[-3:])
-        new_seq = str(last_seq + 1).zfill(3)
-    else:
-        # Start with 001
-        new_seq = '001'
-    
-    # Combine all parts
-    student_id = f"{prefix}{batch}S{new_seq}"
-    return student_id
\ No newline at end of file
+    prefix = f"{program_code[:3].upper()}{batch}S"
+
+    sequence = reserve(
+        f'student:{prefix}',
+        seed=lambda: max_suffix(
+            STUDENT_MASTER.objects.filter(STUDENT_ID__startswith=prefix).values_list('STUDENT_ID', flat=True), prefix
+        ),
+    )
+    return f"{prefix}{sequence:03d}"